@@ -1,64 +1,2875 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import csv
 import os
+import sys
+import argparse
+import operator
+import heapq
+import difflib
+import bisect
+import itertools
+import math
+import re
+import time
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
-from collections import defaultdict
+import numpy as np
+from collections import Counter, defaultdict, OrderedDict
 from reportlab.lib.pagesizes import LETTER
 from reportlab.pdfgen import canvas
+from reportlab.lib.utils import ImageReader
 import json # Added for achievements
+import io
+import base64
+import gzip
+import pickle
+import hashlib
+import struct
+import tempfile
+import array
+import mmap
+import asyncio
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+try:
+    import fcntl # Advisory locking; not available on Windows
+except ImportError:
+    fcntl = None
 
 LOG_FILE = "work_log.csv"
 METADATA_FILE = "task_metadata.csv"
 PROJECTS_FILE = "projects.csv"
 GAMES_FILE = "games.json" # Added for achievements
+TASK_LINKS_FILE = "task_links.csv" # Log descriptions linked to Task Overview task IDs
+METADATA_HEADER = ["Project", "Task", "Importance", "Urgency", "Deadline", "Status", "Prize", "ID", "Estimate"]
+# Fixed column offsets; the schema migrations guarantee every row has all of them.
+(META_PROJECT, META_TASK, META_IMPORTANCE, META_URGENCY, META_DEADLINE, META_STATUS, META_PRIZE, META_ID,
+ META_ESTIMATE) = range(len(METADATA_HEADER))
+DEADLINE_FORMAT = "%Y-%m-%d"
+TASK_MATCH_CUTOFF = 0.8 # Minimum similarity for linking legacy log descriptions to tasks
+SNAPSHOT_FILE = "work_log.snapshot" # Binary startup cache for LOG_FILE
+SNAPSHOT_MAGIC = b"WLSNAP"
+SNAPSHOT_ROWS_MAGIC = b"WLROWS" # Rows of the snapshot, kept apart so that aggregates load without them
+SNAPSHOT_VERSION = 10
+HASH_READ_SIZE = 1 << 20 # Bytes read at a time when hashing the log
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M"
+LOG_POLL_INTERVAL_MS = 1000 # How often to look for rows appended by other programs
+LOG_HEADER = ["Date", "Project", "Task", "Hours"]
+IMPORT_CHUNK_SIZE = 10000 # Rows validated per batch by the bulk importer
+MAX_IMPORT_ERRORS = 100 # Rejected rows kept for the import report
+MAX_REPORTED_ISSUES = 100 # Examples kept per kind of integrity issue
+DUPLICATE_ERROR_RATE = 1e-5 # False positive rate of the duplicate filter
+LOG_PAGE_SIZE = 500 # Rows materialized in the log Treeview at a time
+BUCKET_GRANULARITIES = ("day", "week", "month", "year") # Rollup tables kept per project
+TIMER_JOURNAL_FILE = "timer.journal" # State of the running timer, for crash recovery
+TIMER_CHECKPOINT_SECONDS = 30 # A crash loses at most this much timed work
+TIMER_TICK_MS = 1000
+CHART_CACHE_DIR = "chart_cache" # Rendered charts evicted from memory
+CHART_CACHE_ENTRIES = 12 # Rendered charts kept in memory
+CHART_CACHE_DISK_ENTRIES = 100
+STATISTICS_CHARTS = ("totals", "weekly", "cumulative")
+API_HOST = "127.0.0.1" # The local API never listens beyond this machine
+API_PORT = 8765
+API_FLUSH_DELAY = 0.2 # Seconds appended rows are gathered before one write
+API_POLL_MS = 20 # How often the GUI lets the API's event loop run
+API_MAX_BODY = 10 * 1024 * 1024
+HEATMAP_CELL = 11 # Pixel size of one day in the calendar heatmap
+HEATMAP_GAP = 2
+HEATMAP_MARGIN = 50 # Room for the year labels
+HEATMAP_LEVELS = (1, 3, 6) # Hours at which a day moves to the next color
+HEATMAP_COLORS = ("#ebedf0", "#9be9a8", "#40c463", "#30a14e", "#216e39")
+SCHEMA_FILE = "schema.json" # Version of the on-disk layout of the data files
+SCHEMA_VERSION = 4
+VELOCITY_WINDOW = 28 # Days averaged into a project's velocity (hours per day)
+FORECAST_HORIZON_DAYS = 3650 # Completion dates further out are shown as unknown
+FORECAST_STATUS_ORDER = ("Overdue", "At risk", "On track", "No deadline")
+ROLLUP_MAGIC = b"WLROLL" # Aggregates of one archived year
+ROLLUP_VERSION = 1
+ROLLUP_FIELDS = ("total", "per_day", "day_rows", "per_week", "per_year", "buckets", "project_rollups", "task_rollups")
 
 # Initialize CSV files if they don't exist
 if not os.path.exists(LOG_FILE):
     with open(LOG_FILE, mode='w', newline='') as file:
         writer = csv.writer(file)
-        writer.writerow(["Date", "Project", "Task", "Hours"])
+        writer.writerow(LOG_HEADER)
 
 # === Prize Feature: Add "Prize" column to header ===
 if not os.path.exists(METADATA_FILE):
     with open(METADATA_FILE, mode='w', newline='') as file:
         writer = csv.writer(file)
-        writer.writerow(["Project", "Task", "Importance", "Urgency", "Deadline", "Status", "Prize"])
+        writer.writerow(METADATA_HEADER)
 
 if not os.path.exists(PROJECTS_FILE):
     with open(PROJECTS_FILE, mode='w', newline='') as file:
         writer = csv.writer(file)
         writer.writerows([["Bathymetry"], ["Synchronization"], ["Alaska"], ["Estimation"], ["Other"]])
 
+if not os.path.exists(TASK_LINKS_FILE):
+    with open(TASK_LINKS_FILE, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["Project", "Description", "TaskID"])
+    LINK_LEGACY_TASKS = True # First run with task links: match existing log rows once
+else:
+    LINK_LEGACY_TASKS = False
+
 # Initialize games.json if it doesn't exist
 if not os.path.exists(GAMES_FILE):
     with open(GAMES_FILE, mode='w') as file:
         json.dump({"games": []}, file, indent=4)
 
+
+# === Concurrency: advisory locks, atomic rewrites and version checks ===
+class ConcurrentModificationError(Exception):
+    """Raised when a file changed on disk after we last read it."""
+
+
+def file_version(path):
+    """Cheap identity of a file's current contents, compared before rewriting it."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def hash_prefix(file, length=None):
+    """SHA-256 object over the next ``length`` bytes of a binary file (the rest if None); None if it is shorter."""
+    digest = hashlib.sha256()
+    remaining = length
+    while remaining is None or remaining > 0:
+        chunk = file.read(HASH_READ_SIZE if remaining is None else min(remaining, HASH_READ_SIZE))
+        if not chunk:
+            return digest if remaining is None else None
+        digest.update(chunk)
+        if remaining is not None:
+            remaining -= len(chunk)
+    return digest
+
+
+@contextmanager
+def locked_file(path, shared=False):
+    """Hold an advisory lock for ``path`` for the duration of the block.
+
+    The lock lives on a separate ``.lock`` file so that it survives the data
+    file being atomically replaced.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write(path, write_func, binary=False):
+    """Write a complete new version of ``path`` to a temp file, then rename it over the old one."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb' if binary else 'w', **({} if binary else {"newline": ""})) as file:
+            write_func(file)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_rows(path, rows):
+    atomic_write(path, lambda file: csv.writer(file).writerows(rows))
+
+
+def append_rows(path, rows):
+    """Append CSV rows while holding the file's lock, so rewrites never drop them."""
+    with locked_file(path):
+        with open(path, mode='a', newline='') as file:
+            csv.writer(file).writerows(rows)
+
+
+def write_checked_pickle(path, magic, version, obj):
+    """Atomically write ``obj`` behind a magic, a format version and a SHA-256 of the payload."""
+    payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def write(file):
+        file.write(magic + struct.pack("<I", version))
+        file.write(hashlib.sha256(payload).digest())
+        file.write(payload)
+    atomic_write(path, write, binary=True)
+
+
+def read_checked_pickle(path, magic, version):
+    """Object written by write_checked_pickle; None if missing, corrupt or from another version."""
+    try:
+        with open(path, 'rb') as file:
+            data = file.read()
+    except OSError:
+        return None
+    prefix_len = len(magic) + 4
+    if data[:len(magic)] != magic:
+        return None
+    if struct.unpack("<I", data[len(magic):prefix_len])[0] != version:
+        return None
+    digest, payload = data[prefix_len:prefix_len + 32], data[prefix_len + 32:]
+    if hashlib.sha256(payload).digest() != digest:
+        return None
+    try:
+        return pickle.loads(payload)
+    except Exception:
+        return None
+
+
+# === Archive: closed years of the log as compressed per-year partitions ===
+def archive_dir_for(log_path):
+    return os.path.splitext(log_path)[0] + "_archive"
+
+
+def partition_paths(log_path, year):
+    """(rows, rollup) paths of the archive partition holding ``year``."""
+    directory = archive_dir_for(log_path)
+    return os.path.join(directory, f"{year}.csv.gz"), os.path.join(directory, f"{year}.rollup")
+
+
+def archive_journal_path(log_path):
+    """Marker written while rows move from the log into the archive; its presence means a move was interrupted."""
+    return os.path.join(archive_dir_for(log_path), "pending_move.json")
+
+
+def archived_years(log_path):
+    try:
+        names = os.listdir(archive_dir_for(log_path))
+    except OSError:
+        return []
+    return sorted(int(name[:-7]) for name in names if name.endswith(".csv.gz") and name[:-7].isdigit())
+
+
+def read_partition(path):
+    """Rows of a compressed partition file, without its header."""
+    with gzip.open(path, 'rt', newline='', encoding='utf-8', errors='replace') as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        return [row for row in reader if len(row) == 4]
+
+
+def write_partition(path, rows):
+    def write(file):
+        # mtime=0 keeps the bytes a function of the rows alone.
+        with gzip.GzipFile(fileobj=file, mode='wb', mtime=0) as compressed:
+            text = io.TextIOWrapper(compressed, encoding='utf-8', newline='')
+            writer = csv.writer(text)
+            writer.writerow(LOG_HEADER)
+            writer.writerows(rows)
+            text.flush()
+            text.detach()
+    atomic_write(path, write, binary=True)
+
+
+def parse_log_date(date_str):
+    """Fast path for datetime.strptime(date_str, LOG_DATE_FORMAT)."""
+    if len(date_str) == 16 and date_str[4] == '-' and date_str[7] == '-' and date_str[10] == ' ' and date_str[13] == ':':
+        try:
+            return datetime(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]),
+                            int(date_str[11:13]), int(date_str[14:16]))
+        except ValueError:
+            pass
+    return datetime.strptime(date_str, LOG_DATE_FORMAT)
+
+
+_log_days = {}
+_log_times = set()
+
+
+def parse_log_day(date_str):
+    """The date() of a log timestamp, memoized by day and by time of day.
+
+    Logs contain few distinct days and at most 1440 distinct times, so large
+    files are validated with two lookups per row instead of a full parse.
+    """
+    day = _log_days.get(date_str[:10])
+    if day is not None and date_str[10:] in _log_times and len(date_str) == 16:
+        return day
+    day = parse_log_date(date_str).date()
+    if len(date_str) == 16 and date_str[4] == '-' and date_str[7] == '-' and date_str[10] == ' ' and date_str[13] == ':':
+        _log_days[date_str[:10]] = day
+        _log_times.add(date_str[10:])
+    return day
+
+
+def bucket_keys(day):
+    """Rollup keys of a date: the date itself, "YYYY-Www" (ISO week), "YYYY-MM" and the year."""
+    iso_year, iso_week, _ = day.isocalendar()
+    return (day, f"{iso_year}-W{iso_week:02d}", f"{day.year}-{day.month:02d}", day.year)
+
+
+# === Schema: versioned data files and one-time migrations ===
+class SchemaVersionError(Exception):
+    """Raised when the data files were written by a newer version of the planner."""
+
+
+class MigrationError(Exception):
+    """Raised when a data file is too damaged to upgrade without losing data; nothing was written."""
+
+
+def read_schema_version(path=SCHEMA_FILE):
+    """Schema version of the data files; 0 for files that predate versioning."""
+    try:
+        with open(path, 'r') as file:
+            return int(json.load(file).get("version", 0))
+    except FileNotFoundError:
+        return 0
+
+
+def migrate_task_metadata(path=METADATA_FILE):
+    """Schemas 1 and 4: rewrite the metadata file with METADATA_HEADER, a value for every column and a stable ID per task.
+
+    Rows written by older versions lack the Status, Prize or ID columns or
+    are shorter than their header; missing cells get their defaults instead
+    of the row being dropped.
+    """
+    with locked_file(path):
+        with open(path, 'r', newline='') as file:
+            rows = list(csv.reader(file))
+        if not rows:
+            atomic_write_rows(path, [METADATA_HEADER])
+            return
+        header, body = rows[0], rows[1:]
+        col_map = {name: idx for idx, name in enumerate(header)}
+        upgraded, used_ids = [], set()
+        for row in body:
+            if len(row) < 2:
+                continue
+            new_row = []
+            for name in METADATA_HEADER:
+                idx = col_map.get(name)
+                new_row.append(row[idx] if idx is not None and idx < len(row) else "")
+            new_row[META_STATUS] = new_row[META_STATUS] or "To-Do"
+            upgraded.append(new_row)
+            if new_row[META_ID].isdigit():
+                used_ids.add(int(new_row[META_ID]))
+        next_id = max(used_ids, default=0) + 1
+        seen = set()
+        for row in upgraded:
+            if not row[META_ID].isdigit() or row[META_ID] in seen:
+                row[META_ID] = str(next_id)
+                next_id += 1
+            seen.add(row[META_ID])
+        atomic_write_rows(path, [METADATA_HEADER] + upgraded)
+
+
+def repair_task_layout(path=METADATA_FILE):
+    """Rerun migrate_task_metadata when a row no longer fits METADATA_HEADER.
+
+    The schema version only records that the file was upgraded once; older
+    scripts may still append short rows or blank lines afterwards.
+    """
+    if not os.path.exists(path):
+        return
+    with locked_file(path, shared=True):
+        with open(path, 'r', newline='') as file:
+            reader = csv.reader(file)
+            fits = next(reader, None) == METADATA_HEADER and all(
+                len(row) == len(METADATA_HEADER) and row[META_ID].isdigit() for row in reader)
+    if not fits:
+        migrate_task_metadata(path) # takes its own lock; locks are never nested
+
+
+def migrate_work_log(path=LOG_FILE, snapshot_path=SNAPSHOT_FILE):
+    """Schema 2: give the work log the LOG_HEADER header and canonical LOG_DATE_FORMAT timestamps.
+
+    Rows without four columns are kept as they are; the store still sets
+    aside such rows when other programs append them.
+    """
+    with locked_file(path):
+        with open(path, 'r', newline='', encoding='utf-8', errors='replace') as file:
+            rows = list(csv.reader(file))
+        header, body = (rows[0], rows[1:]) if rows else (None, [])
+        if header is not None and header != LOG_HEADER:
+            try:
+                parse_log_date(header[0])
+                body = rows # No header at all: the first row is data
+            except (ValueError, IndexError):
+                pass
+        changed = header != LOG_HEADER
+        for row in body:
+            if len(row) != 4 or len(row[0]) == 16:
+                continue
+            try:
+                row[0] = parse_log_date(row[0].strip()).strftime(LOG_DATE_FORMAT)
+            except ValueError:
+                continue
+            changed = True
+        if not changed:
+            return
+        atomic_write_rows(path, [LOG_HEADER] + body)
+    discard_snapshot(snapshot_path)
+
+
+def discard_snapshot(path=SNAPSHOT_FILE):
+    """Drop the snapshot after rewriting the log behind its back; it describes the old bytes."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+ACHIEVEMENT_DEFAULTS = {"name": "", "description": "", "type": "manual", "target": None,
+                        "linked_to": None, "linked_task": None, "unlocked": False}
+
+
+def migrate_games(path=GAMES_FILE):
+    """Schema 3: every game has a name and an achievement list, every achievement all ACHIEVEMENT_DEFAULTS keys.
+
+    A file that is not in the documented layout is left untouched and
+    MigrationError is raised, so a typo never costs the achievements.
+    """
+    with locked_file(path):
+        try:
+            with open(path, 'r') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            data = {}
+        except json.JSONDecodeError as e:
+            raise MigrationError(f"{path} is not valid JSON (line {e.lineno}: {e.msg}). "
+                                 "Fix or restore it, then start the planner again.")
+        games = data.get("games", []) if isinstance(data, dict) else None
+        if not isinstance(games, list) or not all(
+                isinstance(game, dict) and isinstance(game.get("achievements", []), list)
+                and all(isinstance(ach, dict) for ach in game.get("achievements", [])) for game in games):
+            raise MigrationError(f"{path} does not hold a list of games, each with a list of achievement "
+                                 "objects. Fix or restore it, then start the planner again.")
+        for number, game in enumerate(games, 1):
+            game.setdefault("name", f"Game {number}")
+            game["achievements"] = [dict(ACHIEVEMENT_DEFAULTS, **ach) for ach in game.get("achievements", [])]
+        data["games"] = games
+        atomic_write(path, lambda file: json.dump(data, file, indent=4))
+
+
+# (version, migration) in order; each runs once, when the recorded version is below its own.
+MIGRATIONS = [
+    (1, migrate_task_metadata),
+    (2, migrate_work_log),
+    (3, migrate_games),
+    (4, migrate_task_metadata), # Adds the Estimate column
+]
+
+
+def run_migrations(path=SCHEMA_FILE):
+    """Upgrade the data files to SCHEMA_VERSION; returns the versions that were applied.
+
+    The version is recorded after every step, so an interrupted upgrade
+    resumes with the step that did not finish.
+    """
+    with locked_file(path):
+        version = read_schema_version(path)
+        if version > SCHEMA_VERSION:
+            raise SchemaVersionError(f"The data files use schema version {version}, but this planner only "
+                                     f"understands up to version {SCHEMA_VERSION}. Please update the planner.")
+        applied = []
+        for target, migrate in MIGRATIONS:
+            if version < target:
+                migrate()
+                version = target
+                atomic_write(path, lambda file: json.dump({"version": version}, file))
+                applied.append(target)
+        return applied
+
+
+# === Task Links: stable task IDs and log-description -> task links ===
+
+
+def load_task_links(path=TASK_LINKS_FILE):
+    links = {}
+    if os.path.exists(path):
+        with open(path, 'r', newline='') as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            for row in reader:
+                if len(row) == 3:
+                    links[(row[0], row[1])] = row[2]
+    return links
+
+
+def save_task_links(links, path=TASK_LINKS_FILE):
+    with locked_file(path):
+        atomic_write_rows(path, [["Project", "Description", "TaskID"]] +
+                          [[project, description, task_id] for (project, description), task_id in sorted(links.items())])
+
+
+# === Autocomplete: prefix index over past task descriptions ===
+class PrefixIndex:
+    """Per-project sorted index of task descriptions for prefix completion.
+
+    Lower-cased descriptions are kept in a sorted list, so all completions of a
+    prefix form one contiguous slice located with bisect. Each description
+    carries its use count and latest timestamp for ranking.
+    """
+
+    MAX_SCAN = 2000 # Candidates ranked per query; bounds the cost of one-letter prefixes
+    RECENCY_DAYS = 30.0
+
+    def __init__(self):
+        self.keys = defaultdict(list)
+        self.stats = defaultdict(dict)
+
+    @classmethod
+    def from_task_rollups(cls, task_rollups):
+        """Build the index in one pass and one sort per project (no per-item insort)."""
+        index = cls()
+        for (project, description), (_, count, stamp) in task_rollups.items():
+            index._merge(project, description, count, stamp)
+        for project, stats in index.stats.items():
+            index.keys[project] = sorted(stats)
+        return index
+
+    def _merge(self, project, description, count, stamp):
+        description = description.strip()
+        if not description:
+            return False
+        key = description.lower()
+        entry = self.stats[project].get(key)
+        if entry is None:
+            self.stats[project][key] = [description, count, stamp]
+            return True
+        entry[1] += count
+        if stamp > entry[2]:
+            entry[0], entry[2] = description, stamp
+        return False
+
+    def add(self, project, description, stamp, count=1):
+        if self._merge(project, description, count, stamp):
+            bisect.insort(self.keys[project], description.strip().lower())
+
+    def suggest(self, project, prefix, limit=8):
+        """Best completions of ``prefix``, ranked by use count decayed by age."""
+        key = prefix.strip().lower()
+        keys = self.keys.get(project)
+        if not key or not keys:
+            return []
+        start = bisect.bisect_left(keys, key)
+        stats = self.stats[project]
+        today = datetime.now().date()
+        scored = []
+        for candidate in keys[start:start + self.MAX_SCAN]:
+            if not candidate.startswith(key):
+                break
+            if candidate == key:
+                continue
+            text, count, stamp = stats[candidate]
+            try:
+                age_days = max((today - parse_log_day(stamp)).days, 0)
+            except ValueError:
+                age_days = 0
+            scored.append((count / (1.0 + age_days / self.RECENCY_DAYS), text))
+        return [text for _, text in heapq.nlargest(limit, scored)]
+
+
+# === Timer Feature: journal of the running timer ===
+def save_timer_journal(timer):
+    """Checkpoint the running timer: project, task, start time and the time of this checkpoint."""
+    timer["checkpoint"] = time.time()
+    atomic_write(TIMER_JOURNAL_FILE, lambda file: json.dump(timer, file))
+
+
+def load_timer_journal():
+    """The timer left behind by a crashed session, or None."""
+    try:
+        with open(TIMER_JOURNAL_FILE, 'r') as file:
+            timer = json.load(file)
+        timer["started"] = float(timer["started"])
+        timer["checkpoint"] = float(timer["checkpoint"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if not timer.get("project") or not timer.get("task"):
+        return None
+    return timer
+
+
+def clear_timer_journal():
+    try:
+        os.remove(TIMER_JOURNAL_FILE)
+    except FileNotFoundError:
+        pass
+
+
+# === Search: inverted token index and day index over the work log ===
+class LogSearchIndex:
+    """Search structures over the rows of a WorkLogStore.
+
+    Descriptions are tokenized once per distinct (project, description) pair;
+    tokens map to descriptions and descriptions to row IDs. Rows are also
+    bucketed by day, with a sorted day list for range lookups, and by project.
+    Archived rows the store has loaded are indexed alongside the live ones.
+    """
+
+    TOKEN_RE = re.compile(r"\w+")
+
+    def __init__(self, store):
+        self.store = store
+        self.rows_by_description = defaultdict(set)
+        self.token_descriptions = defaultdict(set)
+        self.rows_by_day = defaultdict(set)
+        self.rows_by_project = defaultdict(set)
+        for entries in (store.entries, store.archived_entries):
+            for row_id, row in entries.items():
+                self._index(row_id, row)
+        self.tokens = sorted(self.token_descriptions)
+        self.days = sorted(self.rows_by_day)
+
+    def _index(self, row_id, row):
+        """Index a row; returns the (new_tokens, new_day) it introduced."""
+        new_tokens, new_day = [], None
+        description = (row[1], row[2])
+        rows = self.rows_by_description.get(description)
+        if rows is None:
+            rows = self.rows_by_description[description] = set()
+            for token in set(self.TOKEN_RE.findall(row[2].lower())):
+                if token not in self.token_descriptions:
+                    new_tokens.append(token)
+                self.token_descriptions[token].add(description)
+        rows.add(row_id)
+        self.rows_by_project[row[1]].add(row_id)
+        try:
+            day = parse_log_day(row[0])
+        except ValueError:
+            return new_tokens, None
+        if day not in self.rows_by_day:
+            new_day = day
+        self.rows_by_day[day].add(row_id)
+        return new_tokens, new_day
+
+    def add(self, row_id, row):
+        new_tokens, new_day = self._index(row_id, row)
+        for token in new_tokens:
+            bisect.insort(self.tokens, token)
+        if new_day is not None:
+            bisect.insort(self.days, new_day)
+
+    def remove(self, row_id, row):
+        self.rows_by_description.get((row[1], row[2]), set()).discard(row_id)
+        self.rows_by_project.get(row[1], set()).discard(row_id)
+        try:
+            self.rows_by_day.get(parse_log_day(row[0]), set()).discard(row_id)
+        except ValueError:
+            pass
+
+    def _descriptions_for_word(self, word, prefix):
+        if not prefix:
+            return self.token_descriptions.get(word, set())
+        matches = set()
+        start = bisect.bisect_left(self.tokens, word)
+        for index in range(start, len(self.tokens)):
+            token = self.tokens[index]
+            if not token.startswith(word):
+                break
+            matches |= self.token_descriptions[token]
+        return matches
+
+    def query(self, text="", project="", date_from=None, date_to=None, min_hours=None, max_hours=None):
+        """Sorted IDs of rows matching every given filter.
+
+        All words of ``text`` must occur in the description; the last word
+        also matches as a prefix, so results follow the user while typing.
+        """
+        candidates = None
+
+        def narrow(ids):
+            nonlocal candidates
+            if candidates is None:
+                candidates = set(ids)
+            else:
+                candidates &= ids if isinstance(ids, set) else set(ids)
+
+        words = self.TOKEN_RE.findall(text.lower())
+        if words:
+            description_sets = sorted((self._descriptions_for_word(word, i == len(words) - 1)
+                                       for i, word in enumerate(words)), key=len)
+            descriptions = set(description_sets[0])
+            for other in description_sets[1:]:
+                descriptions &= other
+            ids = set()
+            for description in descriptions:
+                if not project or description[0] == project:
+                    ids |= self.rows_by_description[description]
+            narrow(ids)
+        if project:
+            narrow(self.rows_by_project.get(project, set()))
+        if date_from is not None or date_to is not None:
+            lo = bisect.bisect_left(self.days, date_from) if date_from is not None else 0
+            hi = bisect.bisect_right(self.days, date_to) if date_to is not None else len(self.days)
+            ids = set()
+            for day in self.days[lo:hi]:
+                ids |= self.rows_by_day[day]
+            narrow(ids)
+        if candidates is None:
+            candidates = set(self.store.entries) | set(self.store.archived_entries)
+        if min_hours is not None or max_hours is not None:
+            low = min_hours if min_hours is not None else float("-inf")
+            high = max_hours if max_hours is not None else float("inf")
+            filtered = []
+            for row_id in candidates:
+                try:
+                    if low <= float(self.store.row(row_id)[3]) <= high:
+                        filtered.append(row_id)
+                except ValueError:
+                    continue
+            candidates = filtered
+        return sorted(candidates)
+
+
+# === Streaks: runs of consecutive worked days ===
+class DayRuns:
+    """Maximal runs of consecutive days, kept as sorted start/end ordinals.
+
+    Adding a day extends or merges neighbouring runs and removing one splits
+    its run, so streak queries are a bisect away. Run lengths are kept sorted
+    too, which makes the longest streak a lookup.
+    """
+
+    def __init__(self, starts=(), ends=(), lengths=()):
+        self.starts = list(starts)
+        self.ends = list(ends)
+        self.lengths = list(lengths)
+
+    def state(self):
+        """Plain lists for the snapshot, which must not depend on this class."""
+        return self.starts, self.ends, self.lengths
+
+    def _find(self, ordinal):
+        """Index of the run containing ``ordinal``, or -1."""
+        i = bisect.bisect_right(self.starts, ordinal) - 1
+        return i if i >= 0 and self.ends[i] >= ordinal else -1
+
+    def _drop_length(self, length):
+        del self.lengths[bisect.bisect_left(self.lengths, length)]
+
+    def add(self, day):
+        ordinal = day.toordinal()
+        i = bisect.bisect_right(self.starts, ordinal) - 1
+        if i >= 0 and self.ends[i] >= ordinal:
+            return
+        joins_left = i >= 0 and self.ends[i] == ordinal - 1
+        joins_right = i + 1 < len(self.starts) and self.starts[i + 1] == ordinal + 1
+        if joins_left and joins_right:
+            self._drop_length(self.ends[i] - self.starts[i] + 1)
+            self._drop_length(self.ends[i + 1] - self.starts[i + 1] + 1)
+            self.ends[i] = self.ends.pop(i + 1)
+            del self.starts[i + 1]
+        elif joins_left:
+            self._drop_length(self.ends[i] - self.starts[i] + 1)
+            self.ends[i] = ordinal
+        elif joins_right:
+            i += 1
+            self._drop_length(self.ends[i] - self.starts[i] + 1)
+            self.starts[i] = ordinal
+        else:
+            i += 1
+            self.starts.insert(i, ordinal)
+            self.ends.insert(i, ordinal)
+        bisect.insort(self.lengths, self.ends[i] - self.starts[i] + 1)
+
+    def remove(self, day):
+        ordinal = day.toordinal()
+        i = self._find(ordinal)
+        if i < 0:
+            return
+        start, end = self.starts[i], self.ends[i]
+        self._drop_length(end - start + 1)
+        del self.starts[i], self.ends[i]
+        for piece_start, piece_end in ((start, ordinal - 1), (ordinal + 1, end)):
+            if piece_start <= piece_end:
+                j = bisect.bisect_left(self.starts, piece_start)
+                self.starts.insert(j, piece_start)
+                self.ends.insert(j, piece_end)
+                bisect.insort(self.lengths, piece_end - piece_start + 1)
+
+    def run_length(self, day):
+        """Length of the run containing ``day`` (0 if it was not worked)."""
+        i = self._find(day.toordinal())
+        return self.ends[i] - self.starts[i] + 1 if i >= 0 else 0
+
+    def streak_on(self, day):
+        """Consecutive worked days ending on ``day``."""
+        ordinal = day.toordinal()
+        i = self._find(ordinal)
+        return ordinal - self.starts[i] + 1 if i >= 0 else 0
+
+    def current(self, today):
+        """The streak still alive on ``today``: ending today, or yesterday if today is not worked yet."""
+        return self.streak_on(today) or self.streak_on(today - timedelta(days=1))
+
+    def longest(self):
+        return self.lengths[-1] if self.lengths else 0
+
+
+# === Snapshot Feature: in-memory log store with a binary startup cache ===
+class WorkLogStore:
+    """Parsed rows of the work log plus running aggregates.
+
+    Rows get a session-local integer ID in file order; IDs are never reused,
+    not even after a reload, so a stale ID cannot reach another row. ``offset`` counts the
+    bytes of the log already parsed, so only data appended after it has to be
+    read again. To notice when the file was rewritten instead of appended to,
+    ``file_id`` records the (device, inode) parsed, ``tail_mark`` the last bytes
+    before ``offset`` and ``prefix_hash`` a running SHA-256 of all bytes before
+    ``offset``. With ``index_search`` the search index is built as soon as
+    rows are parsed rather than on the first search.
+    """
+
+    TAIL_MARK_SIZE = 64
+    # Saved in the row section of the snapshot, which is read only once one of them is used
+    ROW_FIELDS = ("entries", "malformed", "by_project")
+
+    def __init__(self, path=LOG_FILE, snapshot_path=SNAPSHOT_FILE, archive=True, index_search=False):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.use_archive = archive
+        self.index_search = index_search
+        self.next_id = 0
+        self.reset()
+
+    def __getattr__(self, name):
+        # Only reached for row fields that load_snapshot left on disk.
+        if name in self.ROW_FIELDS and self.__dict__.get("rows_token") is not None:
+            self.load_snapshot_rows()
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def reset(self):
+        self.header = None
+        self.rows_token = None
+        self.entries = {}
+        self.malformed = {}
+        self.by_project = defaultdict(set)
+        self.project_rollups = {}
+        self.stale_rollups = set()
+        self.task_rollups = {}
+        # Task rollups whose latest row was removed, and the latest archived timestamp per task
+        self.stale_task_rollups = set()
+        self.archived_task_stamps = {}
+        self.day_keys = {}
+        self.offset = 0
+        self.tail_mark = b""
+        self.file_id = None
+        self.prefix_hash = hashlib.sha256()
+        self.stat_key = None
+        self.total = 0.0
+        self.per_day = defaultdict(float)
+        self.day_rows = defaultdict(int)
+        self.per_week = defaultdict(float)
+        self.per_year = defaultdict(float)
+        # granularity -> bucket key -> project -> [hours, rows]
+        self.buckets = {granularity: {} for granularity in BUCKET_GRANULARITIES}
+        # Worked-day runs per project and over all projects
+        self.project_runs = {}
+        self.all_runs = DayRuns()
+        # (project or None, days) -> [end day, hours of the days ending on it], see window_hours
+        self.window_sums = {}
+        # Built by sync (index_search) or on the first search, maintained from then on; never snapshotted.
+        self.search_index = None
+        # Archived years count through their rollups; their rows are read
+        # only when asked for, get IDs then, and are read-only.
+        self.archived_entries = {}
+        self.loaded_years = set()
+        self.archived_bounds = {}
+        self.archive_versions = {}
+        if self.use_archive:
+            self.merge_archive()
+
+    def load(self):
+        """Restore the snapshot if it is still valid, then parse whatever was appended since."""
+        if not self.load_snapshot():
+            self.reset()
+        self.sync()
+
+    def reload(self):
+        self.reset()
+        self.sync()
+
+    def file_unchanged(self, verify_prefix=False):
+        """True if the log is still the file we parsed and starts with the bytes we have already parsed.
+
+        The quick check compares the inode, size and tail mark; ``verify_prefix``
+        also rehashes the parsed bytes, which catches same-length edits in place.
+        """
+        try:
+            with open(self.path, 'rb') as file:
+                st = os.fstat(file.fileno())
+                if st.st_size < self.offset or (self.offset and (st.st_dev, st.st_ino) != self.file_id):
+                    return False
+                file.seek(self.offset - len(self.tail_mark))
+                if file.read(len(self.tail_mark)) != self.tail_mark:
+                    return False
+                if not verify_prefix:
+                    return True
+                file.seek(0)
+                digest = hash_prefix(file, self.offset)
+        except OSError:
+            return False
+        return digest is not None and digest.digest() == self.prefix_hash.digest()
+
+    def ensure_current(self):
+        """Optimistic version check before a rewrite; appends by others are fine."""
+        if not self.file_unchanged(verify_prefix=True):
+            raise ConcurrentModificationError(f"{self.path} was rewritten by another program.")
+
+    def content_key(self):
+        """Identity of the data held, derived from the bytes parsed and the archive merged.
+
+        Equal keys mean equal rows, also across instances and sessions, so
+        it can key caches shared through the disk.
+        """
+        return self.prefix_hash.hexdigest(), tuple(sorted(self.archive_versions.items()))
+
+    def changed_on_disk(self):
+        """Cheap stat() check used by the poller before reading anything."""
+        return file_version(self.path) != self.stat_key
+
+    def sync(self, verify_prefix=False):
+        """Parse rows appended since ``offset``.
+
+        Returns the IDs of the new rows, or None if the file had been truncated
+        or rewritten and was therefore parsed again from the start. The parsed
+        bytes are rehashed if ``verify_prefix`` is set, which catches edits in
+        place that came with an append, or if the file changed without growing.
+        """
+        reloaded = False
+        previous, self.stat_key = self.stat_key, file_version(self.path)
+        verify = verify_prefix or (None not in (previous, self.stat_key) and previous != self.stat_key
+                                   and self.stat_key[1] <= previous[1])
+        if self.offset and not self.file_unchanged(verify_prefix=verify):
+            self.reset()
+            reloaded = True
+        if not os.path.exists(self.path):
+            return None if reloaded else []
+
+        with open(self.path, 'rb') as file:
+            if not self.offset:
+                st = os.fstat(file.fileno())
+                self.file_id = (st.st_dev, st.st_ino)
+            file.seek(self.offset)
+            data = file.read()
+        # Only consume complete lines; a writer may be halfway through a row.
+        end = data.rfind(b"\n") + 1
+        if self.rows_token is not None and (end or self.index_search) and not self.load_snapshot_rows():
+            return None # The snapshot's rows were gone, so the log was parsed again from the start
+        new_ids = []
+        if end:
+            reader = csv.reader(io.StringIO(data[:end].decode('utf-8', errors='replace'), newline=''))
+            if self.header is None:
+                self.header = next(reader, None)
+            for row in reader:
+                row_id = self.add_row(row)
+                if row_id is not None:
+                    new_ids.append(row_id)
+            self.tail_mark = (self.tail_mark + data[:end])[-self.TAIL_MARK_SIZE:]
+            self.prefix_hash.update(data[:end])
+            self.offset += end
+        if self.index_search and self.search_index is None:
+            # Built once over everything parsed; add_row keeps it current afterwards.
+            self.search_index = LogSearchIndex(self)
+        return None if reloaded else new_ids
+
+    def add_row(self, row):
+        row_id = self.next_id
+        self.next_id += 1
+        if len(row) != 4:
+            # Kept only so that rewrites of the file preserve it.
+            self.malformed[row_id] = row
+            return None
+        self.entries[row_id] = row
+        self.by_project[row[1]].add(row_id)
+        self._account(row, 1)
+        if self.search_index is not None:
+            self.search_index.add(row_id, row)
+        return row_id
+
+    def _unindex(self, row_id, project):
+        ids = self.by_project.get(project)
+        if ids is not None:
+            ids.discard(row_id)
+            if not ids:
+                del self.by_project[project]
+
+    def apply_batch(self, deletes=(), updates=None):
+        """Delete and replace rows by ID, then rewrite the log once.
+
+        The caller must hold LOG_FILE's lock. Rows appended by other programs
+        are parsed first so the rewrite keeps them; their IDs are returned.
+        IDs that are gone, e.g. because the log was reloaded since they were
+        read, fail the whole batch.
+        """
+        self.ensure_current()
+        new_ids = self.sync()
+        if new_ids is None or not all(row_id in self.entries for row_id in itertools.chain(deletes, updates or ())):
+            raise ConcurrentModificationError(f"Entries of {self.path} were changed by another program.")
+        for row_id in deletes:
+            row = self.entries.pop(row_id, None)
+            if row is not None:
+                self._unindex(row_id, row[1])
+                self._account(row, -1)
+                if self.search_index is not None:
+                    self.search_index.remove(row_id, row)
+        for row_id, values in (updates or {}).items():
+            row = self.entries.get(row_id)
+            if row is not None:
+                self._unindex(row_id, row[1])
+                self._account(row, -1)
+                if self.search_index is not None:
+                    self.search_index.remove(row_id, row)
+                row[:] = values
+                self.by_project[row[1]].add(row_id)
+                self._account(row, 1)
+                if self.search_index is not None:
+                    self.search_index.add(row_id, row)
+        self.refresh_task_rollup_stamps()
+        self.rewrite()
+        return new_ids
+
+    def refresh_task_rollup_stamps(self):
+        """Recompute the latest timestamp of the task rollups whose latest row was removed."""
+        for project, description in self.stale_task_rollups:
+            rollup = self.task_rollups.get((project, description))
+            if rollup is None:
+                continue
+            stamps = [self.archived_task_stamps[(project, description)]] \
+                if (project, description) in self.archived_task_stamps else []
+            for row_id in self.by_project.get(project, ()):
+                row = self.entries[row_id]
+                if row[2] != description:
+                    continue
+                try:
+                    parse_log_day(row[0])
+                    float(row[3])
+                except ValueError:
+                    continue
+                stamps.append(row[0] if len(row[0]) == 16 else parse_log_date(row[0]).strftime(LOG_DATE_FORMAT))
+            rollup[2] = max(stamps)
+        self.stale_task_rollups.clear()
+
+    def project_rename_updates(self, old_name, new_name):
+        """Row updates moving every entry of ``old_name`` to ``new_name``, found through the project index."""
+        entries = self.entries
+        return {row_id: [entries[row_id][0], new_name, entries[row_id][2], entries[row_id][3]]
+                for row_id in self.by_project.get(old_name, ())}
+
+    def rewrite(self):
+        """Atomically replace the log with the rows held in memory."""
+        def write(file):
+            writer = csv.writer(file)
+            if self.header:
+                writer.writerow(self.header)
+            writer.writerows(row for _, row in heapq.merge(self.entries.items(), self.malformed.items()))
+        atomic_write(self.path, write)
+        with open(self.path, 'rb') as file:
+            st = os.fstat(file.fileno())
+            self.file_id = (st.st_dev, st.st_ino)
+            self.prefix_hash = hash_prefix(file)
+            self.offset = file.tell()
+            file.seek(max(0, self.offset - self.TAIL_MARK_SIZE))
+            self.tail_mark = file.read()
+        self.stat_key = file_version(self.path)
+
+    def _account(self, row, sign):
+        try:
+            day = parse_log_day(row[0])
+            hours = float(row[3])
+        except (ValueError, IndexError):
+            return
+        self.total += sign * hours
+        self.per_day[day] += sign * hours
+        self.day_rows[day] += sign
+        if self.day_rows[day] <= 0:
+            del self.day_rows[day]
+            self.per_day.pop(day, None)
+            self.all_runs.remove(day)
+        elif sign > 0 and self.day_rows[day] == 1:
+            self.all_runs.add(day)
+        keys = self.day_keys.get(day)
+        if keys is None:
+            keys = self.day_keys[day] = bucket_keys(day)
+        self.per_year[day.year] += sign * hours
+        self.per_week[keys[1]] += sign * hours
+        for (project, days), window in self.window_sums.items():
+            if (project is None or project == row[1]) and 0 <= (window[0] - day).days < days:
+                window[1] += sign * hours
+
+        # Per-project rollup tables at every granularity
+        for granularity, key in zip(BUCKET_GRANULARITIES, keys):
+            table = self.buckets[granularity]
+            projects = table.get(key)
+            if projects is None:
+                projects = table[key] = {}
+            bucket = projects.get(row[1])
+            if bucket is None:
+                bucket = projects[row[1]] = [0.0, 0]
+            bucket[0] += sign * hours
+            bucket[1] += sign
+            if bucket[1] <= 0:
+                del projects[row[1]]
+                if not projects:
+                    del table[key]
+            if granularity == "day" and (bucket[1] <= 0 or (sign > 0 and bucket[1] == 1)):
+                runs = self.project_runs.get(row[1])
+                if runs is None:
+                    runs = self.project_runs[row[1]] = DayRuns()
+                if bucket[1] <= 0:
+                    runs.remove(day)
+                else:
+                    runs.add(day)
+
+        # Canonical timestamps sort chronologically as strings.
+        stamp = row[0] if len(row[0]) == 16 else parse_log_date(row[0]).strftime(LOG_DATE_FORMAT)
+
+        # Hours, row count and latest timestamp per (project, task description).
+        task_rollup = self.task_rollups.get((row[1], row[2]))
+        if task_rollup is None:
+            task_rollup = self.task_rollups[(row[1], row[2])] = [0.0, 0, stamp]
+        task_rollup[0] += sign * hours
+        task_rollup[1] += sign
+        if task_rollup[1] <= 0:
+            del self.task_rollups[(row[1], row[2])]
+            self.stale_task_rollups.discard((row[1], row[2]))
+        elif sign > 0 and stamp > task_rollup[2]:
+            task_rollup[2] = stamp
+        elif sign < 0 and stamp == task_rollup[2]:
+            self.stale_task_rollups.add((row[1], row[2]))
+
+        # Per-project rollup
+        rollup = self.project_rollups.get(row[1])
+        if rollup is None:
+            rollup = self.project_rollups[row[1]] = {"hours": 0.0, "entries": 0, "first": stamp, "last": stamp}
+        rollup["hours"] += sign * hours
+        rollup["entries"] += sign
+        if rollup["entries"] <= 0:
+            del self.project_rollups[row[1]]
+            self.stale_rollups.discard(row[1])
+        elif sign > 0:
+            rollup["first"] = min(rollup["first"], stamp)
+            rollup["last"] = max(rollup["last"], stamp)
+        elif stamp in (rollup["first"], rollup["last"]):
+            self.stale_rollups.add(row[1])
+
+    def project_rollup(self, project):
+        """Hours, entry count and first/last timestamps logged for ``project`` (None if never logged)."""
+        rollup = self.project_rollups.get(project)
+        if rollup is not None and project in self.stale_rollups:
+            # A boundary row was removed; rescan only this project's rows.
+            stamps = list(self.archived_bounds.get(project, ()))
+            for row_id in self.by_project.get(project, ()):
+                row = self.entries[row_id]
+                try:
+                    parse_log_day(row[0])
+                    float(row[3])
+                except ValueError:
+                    continue
+                stamps.append(row[0] if len(row[0]) == 16 else parse_log_date(row[0]).strftime(LOG_DATE_FORMAT))
+            rollup["first"], rollup["last"] = min(stamps), max(stamps)
+            self.stale_rollups.discard(project)
+        return rollup
+
+    def rows(self):
+        return list(self.entries.values())
+
+    def row(self, row_id):
+        """A live or loaded archived row by ID."""
+        row = self.entries.get(row_id)
+        return row if row is not None else self.archived_entries.get(row_id)
+
+    def is_archived(self, row_id):
+        return row_id in self.archived_entries
+
+    # --- Archive partitions ---
+    def archived_years(self):
+        return archived_years(self.path) if self.use_archive else []
+
+    def archive_state(self):
+        """Versions of the rollup files, compared to tell whether the archive changed."""
+        return {year: file_version(partition_paths(self.path, year)[1]) for year in self.archived_years()}
+
+    @staticmethod
+    def partition_rollup(rows):
+        """Aggregate tables of ``rows``, in the shape merge_rollup adds."""
+        partition = WorkLogStore(os.devnull, archive=False)
+        for row in rows:
+            partition.add_row(row)
+        return {field: getattr(partition, field) for field in ROLLUP_FIELDS}
+
+    def merge_archive(self):
+        for year in self.archived_years():
+            rows_path, rollup_path = partition_paths(self.path, year)
+            self.archive_versions[year] = file_version(rollup_path)
+            rollup = read_checked_pickle(rollup_path, ROLLUP_MAGIC, ROLLUP_VERSION)
+            if rollup is None or rollup.get("partition") != file_version(rows_path):
+                # Missing, damaged or older than its partition: recount the rows.
+                rollup = self.partition_rollup(read_partition(rows_path))
+            self.merge_rollup(rollup)
+
+    def merge_rollup(self, rollup):
+        """Add the aggregates of an archived partition to the live ones."""
+        self.total += rollup["total"]
+        for field in ("per_day", "per_week", "per_year"):
+            mine = getattr(self, field)
+            for key, hours in rollup[field].items():
+                mine[key] += hours
+        for day, rows in rollup["day_rows"].items():
+            if not self.day_rows.get(day):
+                self.all_runs.add(day)
+            self.day_rows[day] += rows
+        for granularity, table in rollup["buckets"].items():
+            mine = self.buckets[granularity]
+            for key, projects in table.items():
+                target = mine.setdefault(key, {})
+                for project, (hours, rows) in projects.items():
+                    bucket = target.get(project)
+                    if bucket is None:
+                        bucket = target[project] = [0.0, 0]
+                        if granularity == "day":
+                            self.project_runs.setdefault(project, DayRuns()).add(key)
+                    bucket[0] += hours
+                    bucket[1] += rows
+        for key, (hours, rows, last) in rollup["task_rollups"].items():
+            task_rollup = self.task_rollups.setdefault(key, [0.0, 0, last])
+            task_rollup[0] += hours
+            task_rollup[1] += rows
+            task_rollup[2] = max(task_rollup[2], last)
+            self.archived_task_stamps[key] = max(self.archived_task_stamps.get(key, last), last)
+        for project, theirs in rollup["project_rollups"].items():
+            bounds = self.archived_bounds.setdefault(project, [theirs["first"], theirs["last"]])
+            bounds[:] = min(bounds[0], theirs["first"]), max(bounds[1], theirs["last"])
+            mine = self.project_rollups.get(project)
+            if mine is None:
+                self.project_rollups[project] = dict(theirs)
+                continue
+            mine["hours"] += theirs["hours"]
+            mine["entries"] += theirs["entries"]
+            mine["first"] = min(mine["first"], theirs["first"])
+            mine["last"] = max(mine["last"], theirs["last"])
+
+    def load_archived_rows(self, years=None):
+        """Read the rows of archived ``years`` (all if None) that are not loaded yet."""
+        for year in self.archived_years():
+            if year in self.loaded_years or (years is not None and year not in years):
+                continue
+            for row in read_partition(partition_paths(self.path, year)[0]):
+                row_id = self.next_id
+                self.next_id += 1
+                self.archived_entries[row_id] = row
+                if self.search_index is not None:
+                    self.search_index.add(row_id, row)
+            self.loaded_years.add(year)
+
+    def write_archive_partition(self, year, rows):
+        """Write a year's partition, then its rollup, which records the partition it counts."""
+        rows_path, rollup_path = partition_paths(self.path, year)
+        os.makedirs(os.path.dirname(rows_path), exist_ok=True)
+        write_partition(rows_path, sorted(rows, key=operator.itemgetter(0)))
+        rollup = self.partition_rollup(rows)
+        rollup["partition"] = file_version(rows_path)
+        write_checked_pickle(rollup_path, ROLLUP_MAGIC, ROLLUP_VERSION, rollup)
+
+    def archive_closed_years(self, before_year):
+        """Move rows dated before ``before_year`` into the archive; returns {year: rows moved}.
+
+        The caller must hold the log's lock. Partitions are complete on disk
+        before the rows leave the log, and a journal marks the move until it
+        is done. A move interrupted in between is finished by the next call
+        (see finish_pending_archive): rows the partitions already hold are
+        then only removed from the log, not archived twice. The store is
+        rebuilt afterwards, so row IDs change.
+        """
+        self.ensure_current()
+        self.sync()
+        journal = archive_journal_path(self.path)
+        resuming = os.path.exists(journal)
+        moving = defaultdict(list)
+        for row_id, row in self.entries.items():
+            try:
+                year = parse_log_day(row[0]).year
+            except ValueError:
+                continue
+            if year < before_year:
+                moving[year].append(row_id)
+        if moving:
+            if not resuming:
+                os.makedirs(os.path.dirname(journal), exist_ok=True)
+                atomic_write(journal, lambda file: json.dump({"before": before_year}, file))
+            for year, ids in moving.items():
+                rows_path = partition_paths(self.path, year)[0]
+                rows = read_partition(rows_path) if os.path.exists(rows_path) else []
+                pending = [self.entries[row_id] for row_id in ids]
+                if resuming:
+                    already_archived = Counter(map(tuple, rows))
+                    kept = []
+                    for row in pending:
+                        if already_archived[tuple(row)]:
+                            already_archived[tuple(row)] -= 1
+                        else:
+                            kept.append(row)
+                    pending = kept
+                self.write_archive_partition(year, rows + pending)
+            self.apply_batch(deletes=[row_id for ids in moving.values() for row_id in ids])
+        if resuming or moving:
+            os.remove(journal)
+        if moving:
+            self.reload()
+        return {year: len(ids) for year, ids in sorted(moving.items())}
+
+    def rename_archived_project(self, old_name, new_name):
+        """Rename a project inside the archive partitions; True if any changed.
+
+        The caller must hold the log's lock and reload the store afterwards.
+        """
+        changed = False
+        for year in self.archived_years():
+            rows_path, rollup_path = partition_paths(self.path, year)
+            rollup = read_checked_pickle(rollup_path, ROLLUP_MAGIC, ROLLUP_VERSION)
+            if rollup is not None and rollup.get("partition") == file_version(rows_path) \
+                    and old_name not in rollup["project_rollups"]:
+                continue
+            rows = read_partition(rows_path)
+            if not any(row[1] == old_name for row in rows):
+                continue
+            self.write_archive_partition(year, [[row[0], new_name if row[1] == old_name else row[1], row[2], row[3]]
+                                                for row in rows])
+            changed = True
+        return changed
+
+    def day_runs(self, project=None):
+        """Worked-day runs of ``project``, or of all projects if None."""
+        if project is None:
+            return self.all_runs
+        return self.project_runs.get(project) or DayRuns()
+
+    def window_hours(self, project, days, end):
+        """Hours of ``project`` (all projects if None) in the ``days`` days ending on ``end``.
+
+        Every (project, days) asked for keeps a running sum, which _account
+        updates and which slides forward a day at a time, so asking again for
+        the same or a later day costs O(1) amortized instead of ``days`` lookups.
+        """
+        window = self.window_sums.get((project, days))
+        if window is None or end < window[0] or (end - window[0]).days >= days:
+            window = self.window_sums[(project, days)] = [end, sum(
+                _bucket_value(self, "day", end - timedelta(days=offset), project, 0) for offset in range(days))]
+        while window[0] < end:
+            window[0] += timedelta(days=1)
+            window[1] += _bucket_value(self, "day", window[0], project, 0) \
+                - _bucket_value(self, "day", window[0] - timedelta(days=days), project, 0)
+        return window[1]
+
+    def bucket_hours(self, granularity, project=None):
+        """Hours per bucket in key order: [(key, {project: hours})], or [(key, hours)] for one project."""
+        table = self.buckets[granularity]
+        if project is None:
+            return [(key, {name: bucket[0] for name, bucket in table[key].items()}) for key in sorted(table)]
+        return [(key, table[key][project][0]) for key in sorted(table) if project in table[key]]
+
+    def search(self, **filters):
+        """Sorted IDs of the rows matching ``filters`` (see LogSearchIndex.query)."""
+        date_from, date_to = filters.get("date_from"), filters.get("date_to")
+        years = self.archived_years()
+        if date_from is not None:
+            years = [year for year in years if year >= date_from.year]
+        if date_to is not None:
+            years = [year for year in years if year <= date_to.year]
+        self.load_archived_rows(years)
+        if self.search_index is None:
+            self.search_index = LogSearchIndex(self)
+        return self.search_index.query(**filters)
+
+    def _snapshot_state(self):
+        return {
+            "path": os.path.abspath(self.path),
+            "header": self.header,
+            "project_rollups": self.project_rollups,
+            "stale_rollups": self.stale_rollups,
+            "task_rollups": self.task_rollups,
+            "archived_task_stamps": self.archived_task_stamps,
+            "next_id": self.next_id,
+            "offset": self.offset,
+            "tail_mark": self.tail_mark,
+            "file_id": self.file_id,
+            # hashlib objects cannot be pickled; load_snapshot rebuilds the running hash.
+            "prefix_digest": self.prefix_hash.digest(),
+            "total": self.total,
+            "per_day": self.per_day,
+            "day_rows": self.day_rows,
+            "per_week": self.per_week,
+            "per_year": self.per_year,
+            "buckets": self.buckets,
+            "project_runs": {project: runs.state() for project, runs in self.project_runs.items()},
+            "all_runs": self.all_runs.state(),
+            "archived_bounds": self.archived_bounds,
+            "archive_versions": self.archive_versions,
+        }
+
+    def save_snapshot(self):
+        """Write the rows, unless they are still unread from the last snapshot, then the aggregates naming them."""
+        token = self.rows_token
+        if token is None:
+            token = os.urandom(8).hex()
+            rows = {name: getattr(self, name) for name in self.ROW_FIELDS}
+            rows["token"] = token
+            write_checked_pickle(self.snapshot_path + ".rows", SNAPSHOT_ROWS_MAGIC, SNAPSHOT_VERSION, rows)
+        state = self._snapshot_state()
+        state["rows_token"] = token
+        write_checked_pickle(self.snapshot_path, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, state)
+
+    def load_snapshot(self):
+        """Load the snapshot; False if it is missing, stale, corrupt or from another version."""
+        state = read_checked_pickle(self.snapshot_path, SNAPSHOT_MAGIC, SNAPSHOT_VERSION)
+        if not isinstance(state, dict) or state.get("path") != os.path.abspath(self.path):
+            return False
+        if state.get("archive_versions") != self.archive_state():
+            return False
+        # The snapshot only describes the log if the same file still starts with the same bytes.
+        try:
+            with open(self.path, 'rb') as file:
+                st = os.fstat(file.fileno())
+                if (st.st_dev, st.st_ino) != state.get("file_id"):
+                    return False
+                prefix_hash = hash_prefix(file, state.get("offset", 0))
+        except OSError:
+            return False
+        if prefix_hash is None or prefix_hash.digest() != state.get("prefix_digest"):
+            return False
+        for key, value in state.items():
+            if key not in ("path", "prefix_digest"):
+                setattr(self, key, value)
+        # The rows stay on disk until used; see __getattr__ and load_snapshot_rows.
+        for name in self.ROW_FIELDS:
+            del self.__dict__[name]
+        self.prefix_hash = prefix_hash
+        self.project_runs = {project: DayRuns(*runs) for project, runs in self.project_runs.items()}
+        self.all_runs = DayRuns(*self.all_runs)
+        return True
+
+    def load_snapshot_rows(self):
+        """Read the row section of the restored snapshot; False if it no longer matches, after parsing the log again."""
+        token, self.rows_token = self.rows_token, None
+        rows = read_checked_pickle(self.snapshot_path + ".rows", SNAPSHOT_ROWS_MAGIC, SNAPSHOT_VERSION)
+        if isinstance(rows, dict) and rows.get("token") == token:
+            for name in self.ROW_FIELDS:
+                setattr(self, name, rows[name])
+            return True
+        self.reset()
+        self.sync()
+        return False
+
+
+def finish_pending_archive(log_path=LOG_FILE, snapshot_path=SNAPSHOT_FILE):
+    """Complete an archive move interrupted by a crash, so its rows are not counted twice; run at startup."""
+    journal = archive_journal_path(log_path)
+    if not os.path.exists(journal):
+        return
+    try:
+        with open(journal, 'r') as file:
+            before_year = int(json.load(file)["before"])
+    except (ValueError, KeyError, TypeError):
+        # Unreadable journal: every year already in the archive was being moved.
+        before_year = max(archived_years(log_path), default=0) + 1
+    store = WorkLogStore(log_path, snapshot_path)
+    with locked_file(log_path):
+        store.reload()
+        store.archive_closed_years(before_year)
+    store.save_snapshot()
+
+
+# === Bulk Import: stream historical rows from other tools into the log ===
+def is_jsonl_file(path):
+    return path.lower().endswith((".jsonl", ".ndjson", ".json"))
+
+
+def peek_import_columns(source_path):
+    """Column names offered for mapping: the CSV header or the keys of the first JSON record."""
+    with open(source_path, 'r', newline='', encoding='utf-8') as file:
+        if not is_jsonl_file(source_path):
+            return next(csv.reader(file), [])
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                return list(record) if isinstance(record, dict) else []
+    return []
+
+
+def read_import_records(source_path, column_map):
+    """Yield (line_number, [date, project, task, hours]) from a CSV or JSON-lines file.
+
+    ``column_map`` maps each field of LOG_HEADER to the source column holding it.
+    Unreadable records are yielded with None instead of values.
+    """
+    with open(source_path, 'r', newline='', encoding='utf-8') as file:
+        if is_jsonl_file(source_path):
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                if not isinstance(record, dict):
+                    yield line_number, None
+                    continue
+                yield line_number, [str(record.get(column_map[field]) or "") for field in LOG_HEADER]
+            return
+
+        reader = csv.reader(file)
+        header = next(reader, [])
+        try:
+            indices = [header.index(column_map[field]) for field in LOG_HEADER]
+        except ValueError:
+            missing = [column_map[field] for field in LOG_HEADER if column_map[field] not in header]
+            raise ValueError(f"Column(s) not found in {source_path}: {', '.join(missing)}")
+        width = max(indices) + 1
+        pick = operator.itemgetter(*indices)
+        for line_number, row in enumerate(reader, 2):
+            if len(row) < width:
+                yield line_number, None if row else ("", "", "", "")
+                continue
+            yield line_number, pick(row)
+
+
+def validate_import_chunk(chunk, date_format=LOG_DATE_FORMAT):
+    """Split a chunk of records into normalized log rows and (line_number, reason) errors."""
+    valid, errors = [], []
+    for line_number, values in chunk:
+        if values is None:
+            errors.append((line_number, "unreadable record"))
+            continue
+        try:
+            row = normalize_log_row(values, date_format)
+        except ValueError as e:
+            errors.append((line_number, str(e)))
+            continue
+        if row is not None:
+            valid.append(row)
+    return valid, errors
+
+
+def normalize_log_row(values, date_format=LOG_DATE_FORMAT):
+    """Date, project, task and hours as a canonical log row; None for a blank record.
+
+    Raises ValueError with the reason when the record is invalid.
+    """
+    date_str, project, task, hours_str = values
+    date_str, project, task = date_str.strip(), project.strip(), task.strip()
+    if not (date_str or project or task or hours_str.strip()):
+        return None
+    try:
+        if date_format == LOG_DATE_FORMAT:
+            parse_log_day(date_str)
+        else:
+            date_obj = datetime.strptime(date_str, date_format)
+    except ValueError:
+        raise ValueError(f"invalid date '{date_str}'") from None
+    if not project or not task:
+        raise ValueError("missing project or task")
+    try:
+        hours = float(hours_str)
+    except ValueError:
+        raise ValueError(f"invalid hours '{hours_str}'") from None
+    if not hours > 0 or math.isinf(hours):
+        raise ValueError("hours must be positive")
+    if date_format != LOG_DATE_FORMAT:
+        date_str = date_obj.strftime(LOG_DATE_FORMAT)
+    elif len(date_str) != 16:
+        date_str = parse_log_date(date_str).strftime(LOG_DATE_FORMAT)
+    return [date_str, project, task, f"{hours:.2f}"]
+
+
+def import_work_logs(source_path, column_map=None, date_format=LOG_DATE_FORMAT,
+                     log_path=LOG_FILE, chunk_size=IMPORT_CHUNK_SIZE):
+    """Append every valid record of ``source_path`` to the log in one locked batch.
+
+    Records are read and validated ``chunk_size`` at a time, so memory does not
+    grow with the size of the source. If writing fails part-way, the log is
+    truncated back to its previous size. Returns a dict with the number of
+    imported rows, the rejected ones and the set of projects seen.
+    """
+    column_map = {field: (column_map or {}).get(field) or field for field in LOG_HEADER}
+    result = {"imported": 0, "rejected": 0, "errors": [], "projects": set()}
+
+    records = read_import_records(source_path, column_map)
+    with locked_file(log_path):
+        start_size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+        try:
+            with open(log_path, mode='a', newline='') as log_file:
+                writer = csv.writer(log_file)
+                if start_size == 0:
+                    writer.writerow(LOG_HEADER)
+                chunk = []
+                for record in records:
+                    chunk.append(record)
+                    if len(chunk) >= chunk_size:
+                        _write_import_chunk(writer, chunk, date_format, result)
+                        chunk = []
+                _write_import_chunk(writer, chunk, date_format, result)
+        except BaseException:
+            with open(log_path, 'r+b') as log_file:
+                log_file.truncate(start_size)
+            raise
+    return result
+
+
+def _write_import_chunk(writer, chunk, date_format, result):
+    valid, errors = validate_import_chunk(chunk, date_format)
+    writer.writerows(valid)
+    result["imported"] += len(valid)
+    result["rejected"] += len(errors)
+    result["projects"].update(row[1] for row in valid)
+    result["errors"].extend(errors[:MAX_IMPORT_ERRORS - len(result["errors"])])
+
+
+# === Integrity Check: streaming validation and repair of all data files ===
+class BloomFilter:
+    """Approximate set of row digests in a fixed-size bit array.
+
+    ``add`` may report a new digest as seen (at about ``error_rate``) but
+    never the reverse, and memory does not grow with the number of digests.
+    The bit positions are the eight 32-bit words of the digest, which costs
+    a little more memory than the optimal number of hashes but keeps the
+    per-row work small.
+    """
+
+    HASHES = 8
+
+    def __init__(self, capacity, error_rate=DUPLICATE_ERROR_RATE):
+        bits_per_key = -self.HASHES / math.log(1 - error_rate ** (1 / self.HASHES))
+        self.size = min(max(64, int(max(capacity, 1) * bits_per_key)), 2 ** 32)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.positions = struct.Struct(f"<{self.HASHES}I")
+
+    def add(self, digest):
+        """Add a row_digest; True if it may have been added before."""
+        bits, size = self.bits, self.size
+        seen = True
+        for word in self.positions.unpack(digest):
+            bit = word % size
+            mask = 1 << (bit & 7)
+            if not bits[bit >> 3] & mask:
+                bits[bit >> 3] |= mask
+                seen = False
+        return seen
+
+
+def row_digest(row):
+    return hashlib.blake2b("\x1f".join(row).encode("utf-8"), digest_size=32).digest()
+
+
+class IntegrityReport:
+    """Issues found by check_data_files: a count per kind plus the first MAX_REPORTED_ISSUES examples."""
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.examples = defaultdict(list)
+        self.rows_checked = 0
+        self.repairs = []
+
+    def add(self, kind, location, message):
+        self.counts[kind] += 1
+        if len(self.examples[kind]) < MAX_REPORTED_ISSUES:
+            self.examples[kind].append(f"{location}: {message}")
+
+    def add_orphans(self, orphans, what):
+        """Report each project of ``orphans`` ({project: [count, first location]}) once."""
+        for project, (count, location) in sorted(orphans.items()):
+            self.add("orphaned project", location,
+                     f"'{project}' is used by {count} {what} but missing from {PROJECTS_FILE}")
+
+    def lines(self):
+        lines = [f"Checked {self.rows_checked} log rows."]
+        for kind in sorted(self.counts):
+            lines.append(f"{kind}: {self.counts[kind]}")
+            lines.extend("  " + example for example in self.examples[kind])
+            if self.counts[kind] > len(self.examples[kind]):
+                lines.append(f"  ... and {self.counts[kind] - len(self.examples[kind])} more")
+        if not self.counts:
+            lines.append("No problems found.")
+        lines.extend(self.repairs)
+        return lines
+
+
+def log_data_files(log_path=LOG_FILE):
+    """The archive partitions of ``log_path``, oldest first, then the log itself."""
+    return [partition_paths(log_path, year)[0] for year in archived_years(log_path)] + [log_path]
+
+
+def open_log_data(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rt', newline='', encoding='utf-8', errors='replace')
+    return open(path, 'r', newline='', encoding='utf-8', errors='replace')
+
+
+def classify_log_rows(reader):
+    """(line, row, normalized row or None, problem or None) for every non-blank row after the header."""
+    for row in reader:
+        if len(row) != 4:
+            if any(cell.strip() for cell in row):
+                yield reader.line_num, row, None, f"expected 4 columns, found {len(row)}"
+            continue
+        try:
+            normalized = normalize_log_row(row)
+        except ValueError as e:
+            yield reader.line_num, row, None, str(e)
+            continue
+        if normalized is not None:
+            yield reader.line_num, row, normalized, None
+
+
+def check_log_rows(report, log_path, projects):
+    """One streaming pass over the log and its archive.
+
+    Returns the digests of duplicated rows, the files that need a repair
+    and the projects missing from ``projects``. Rows the duplicate filter
+    flags are confirmed by counting their digests exactly in a second
+    pass, which only happens if anything was flagged.
+    """
+    files = [path for path in log_data_files(log_path) if os.path.exists(path)]
+    # Rough row count; compressed partitions hold several times their size.
+    capacity = sum(os.path.getsize(path) * (8 if path.endswith(".gz") else 1) for path in files) // 40
+    seen, flagged, dirty, orphans = BloomFilter(capacity), set(), set(), {}
+    for path in files:
+        with open_log_data(path) as file:
+            reader = csv.reader(file)
+            if next(reader, None) != LOG_HEADER:
+                report.add("bad header", f"{path}:1", "expected " + ",".join(LOG_HEADER))
+                dirty.add(path)
+            for line, row, normalized, problem in classify_log_rows(reader):
+                report.rows_checked += 1
+                if problem is not None:
+                    report.add("malformed row", f"{path}:{line}", problem)
+                    dirty.add(path)
+                    continue
+                digest = row_digest(normalized)
+                if seen.add(digest):
+                    flagged.add(digest)
+                if normalized[1] not in projects:
+                    orphans.setdefault(normalized[1], [0, f"{path}:{line}"])[0] += 1
+    report.add_orphans(orphans, "log rows")
+
+    duplicates, occurrences = set(), defaultdict(int)
+    for path in files if flagged else ():
+        with open_log_data(path) as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            for line, row, normalized, problem in classify_log_rows(reader):
+                digest = row_digest(normalized) if problem is None else None
+                if digest in flagged:
+                    occurrences[digest] += 1
+                    if occurrences[digest] > 1:
+                        duplicates.add(digest)
+                        report.add("duplicate row", f"{path}:{line}", ",".join(row))
+                        dirty.add(path)
+    return duplicates, dirty, set(orphans)
+
+
+def repaired_log_rows(path, duplicates, kept, reject):
+    """Normalized rows of ``path`` minus invalid rows and repeats of a row already in ``kept``.
+
+    ``duplicates`` only narrows which digests have to be remembered in
+    ``kept``; dropped rows are passed to ``reject(path, line, problem, row)``.
+    """
+    with open_log_data(path) as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        for line, row, normalized, problem in classify_log_rows(reader):
+            if problem is None:
+                digest = row_digest(normalized)
+                if digest not in duplicates:
+                    yield normalized
+                    continue
+                if digest not in kept:
+                    kept.add(digest)
+                    yield normalized
+                    continue
+                problem = "duplicate row"
+            reject(path, line, problem, row)
+
+
+def repair_log_rows(report, log_path, duplicates, dirty, snapshot_path=SNAPSHOT_FILE):
+    """Rewrite the ``dirty`` log files; dropped rows are appended to <log>.rejected.csv.
+
+    Files are read in the order check_log_rows read them, so the row kept
+    of each duplicate is its first occurrence. The caller holds the log's lock.
+    """
+    rejected_path = os.path.splitext(log_path)[0] + ".rejected.csv"
+    new_file = not os.path.exists(rejected_path)
+    with open(rejected_path, 'a', newline='', encoding='utf-8') as rejected_file:
+        rejected = csv.writer(rejected_file)
+        if new_file:
+            rejected.writerow(["Source", "Line", "Problem"] + LOG_HEADER)
+        counts = defaultdict(int)
+
+        def reject(path, line, problem, row):
+            counts[path] += 1
+            rejected.writerow([path, line, problem] + row)
+
+        kept = set()
+        for year in archived_years(log_path):
+            path = partition_paths(log_path, year)[0]
+            rows = list(repaired_log_rows(path, duplicates, kept, reject))
+            if path in dirty:
+                WorkLogStore(log_path, archive=False).write_archive_partition(year, rows)
+        if log_path in dirty:
+            def write(file):
+                writer = csv.writer(file)
+                writer.writerow(LOG_HEADER)
+                writer.writerows(repaired_log_rows(log_path, duplicates, kept, reject))
+            atomic_write(log_path, write)
+            discard_snapshot(snapshot_path)
+    for path in sorted(dirty):
+        report.repairs.append(f"Rewrote {path}, moving {counts[path]} rows to {rejected_path}.")
+
+
+def check_task_metadata(report, projects, path=METADATA_FILE):
+    """Validate the task file; returns (task IDs, needs repair, projects missing from ``projects``)."""
+    task_ids, names, orphans, needs_repair = set(), set(), {}, False
+    if not os.path.exists(path):
+        return task_ids, needs_repair, set()
+    with open(path, 'r', newline='', encoding='utf-8', errors='replace') as file:
+        reader = csv.reader(file)
+        if next(reader, None) != METADATA_HEADER:
+            report.add("bad header", f"{path}:1", "expected " + ",".join(METADATA_HEADER))
+            needs_repair = True
+        for row in reader:
+            location = f"{path}:{reader.line_num}"
+            if len(row) != len(METADATA_HEADER):
+                report.add("malformed task", location, f"expected {len(METADATA_HEADER)} columns, found {len(row)}")
+                needs_repair = True
+                continue
+            if not row[META_ID].isdigit() or row[META_ID] in task_ids:
+                report.add("malformed task", location, f"missing or repeated ID '{row[META_ID]}'")
+                needs_repair = True
+            task_ids.add(row[META_ID])
+            if (row[META_PROJECT], row[META_TASK]) in names:
+                report.add("duplicate task", location, f"{row[META_PROJECT]}/{row[META_TASK]}")
+            names.add((row[META_PROJECT], row[META_TASK]))
+            if row[META_ESTIMATE] and parse_estimate(row[META_ESTIMATE]) is None:
+                report.add("bad estimate", location, f"'{row[META_ESTIMATE]}' is not a positive number of hours")
+            if row[META_PROJECT] not in projects:
+                orphans.setdefault(row[META_PROJECT], [0, location])[0] += 1
+    report.add_orphans(orphans, "tasks")
+    return task_ids, needs_repair, set(orphans)
+
+
+def check_games(report, projects, task_ids, path=GAMES_FILE):
+    """Validate games.json; returns (needs migrate_games, dangling task links, missing projects)."""
+    try:
+        with open(path, 'r') as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return False, False, set()
+    except json.JSONDecodeError as e:
+        # Not repaired: rewriting it would throw the achievements away.
+        report.add("malformed achievement", f"{path}:{e.lineno}", e.msg)
+        return False, False, set()
+    needs_migration, dangling, orphans = False, False, {}
+    games = data.get("games", []) if isinstance(data, dict) else None
+    if not isinstance(games, list):
+        report.add("malformed achievement", path, "expected an object with a list of games")
+        return False, False, set()
+    unrepairable = False # Structural damage is left for the user; the repairs assume the documented layout.
+    for index, game in enumerate(games):
+        achievements = game.get("achievements", []) if isinstance(game, dict) else None
+        if not isinstance(achievements, list):
+            report.add("malformed achievement", f"{path}: game {index + 1}", "expected an object with a list of achievements")
+            unrepairable = True
+            continue
+        for ach in achievements:
+            if not isinstance(ach, dict):
+                report.add("malformed achievement", f"{path}: {game.get('name')}", f"expected an object, found {ach!r}")
+                unrepairable = True
+                continue
+            location = f"{path}: {game.get('name')}/{ach.get('name')}"
+            if not all(isinstance(ach.get(key) or "", str) for key in ("linked_to", "linked_task")):
+                report.add("malformed achievement", location, "linked_to and linked_task must be strings")
+                unrepairable = True
+                continue
+            missing = [key for key in ACHIEVEMENT_DEFAULTS if key not in ach]
+            if missing:
+                report.add("malformed achievement", location, "missing " + ", ".join(missing))
+                needs_migration = True
+            if ach.get("type", "manual") not in ACHIEVEMENT_TYPES:
+                report.add("malformed achievement", location, f"unknown type '{ach['type']}'")
+            if ach.get("linked_to") and ach["linked_to"] not in projects:
+                orphans.setdefault(ach["linked_to"], [0, location])[0] += 1
+            if ach.get("linked_task") and ach["linked_task"] not in task_ids:
+                report.add("dangling task link", location, f"task ID {ach['linked_task']} does not exist")
+                dangling = True
+    report.add_orphans(orphans, "achievements")
+    if unrepairable:
+        return False, False, set(orphans)
+    return needs_migration, dangling, set(orphans)
+
+
+def check_data_files(repair=False, log_path=LOG_FILE):
+    """Validate the log, its archive, tasks, projects, achievements and task links.
+
+    Every file is streamed once, so memory is bounded by the number of
+    projects and tasks and by the size of the duplicate filter, not by the
+    size of the log. With ``repair``, invalid and duplicated log rows move
+    to a rejected-rows file, projects in use are added back to the project
+    list, task and achievement files are migrated again and links to
+    missing tasks are dropped. Returns an IntegrityReport.
+    """
+    report = IntegrityReport()
+    with open(PROJECTS_FILE, 'r', newline='') as file:
+        project_list = [row[0] for row in csv.reader(file) if row]
+    projects = set(project_list)
+    bad_project_list = len(projects) != len(project_list) or "" in projects
+    if bad_project_list:
+        report.add("bad project list", PROJECTS_FILE, "blank or repeated project names")
+
+    task_ids, tasks_need_repair, task_orphans = check_task_metadata(report, projects)
+    games_need_migration, games_dangling, game_orphans = check_games(report, projects, task_ids)
+    links = load_task_links()
+    dangling_links = {key for key, task_id in links.items() if task_id not in task_ids}
+    for project, description in sorted(dangling_links):
+        report.add("dangling task link", TASK_LINKS_FILE, f"{project}/{description} -> task ID {links[(project, description)]}")
+
+    with locked_file(log_path, shared=not repair):
+        duplicates, dirty, log_orphans = check_log_rows(report, log_path, projects)
+        if repair and dirty:
+            repair_log_rows(report, log_path, duplicates, dirty)
+    if not repair:
+        return report
+
+    missing = sorted((task_orphans | game_orphans | log_orphans) - projects)
+    if missing or bad_project_list:
+        with locked_file(PROJECTS_FILE):
+            atomic_write_rows(PROJECTS_FILE, [[name] for name in dict.fromkeys(project_list + missing) if name])
+        report.repairs.append(f"Added {len(missing)} projects to {PROJECTS_FILE}.")
+    if tasks_need_repair:
+        migrate_task_metadata()
+        report.repairs.append(f"Rewrote {METADATA_FILE} with every column and unique task IDs.")
+    if games_need_migration:
+        migrate_games()
+        report.repairs.append(f"Filled in the missing fields of {GAMES_FILE}.")
+    if games_dangling:
+        with locked_file(GAMES_FILE):
+            with open(GAMES_FILE, 'r') as file:
+                data = json.load(file)
+            for game in data["games"]:
+                for ach in game["achievements"]:
+                    if ach["linked_task"] not in task_ids:
+                        ach["linked_task"] = None
+            atomic_write(GAMES_FILE, lambda file: json.dump(data, file, indent=4))
+        report.repairs.append("Unlinked achievements from missing tasks.")
+    if dangling_links:
+        save_task_links({key: task_id for key, task_id in links.items() if key not in dangling_links})
+        report.repairs.append(f"Dropped {len(dangling_links)} links to missing tasks from {TASK_LINKS_FILE}.")
+    return report
+
+
+# === Reports: statistics shared by the GUI and the command line ===
+class StreamingStats:
+    """One pass over a log file in chunks, for reports on archives too large to load.
+
+    Only hours per project and per (day, project) are kept, so memory grows
+    with the calendar span and the number of projects, not with the entries.
+    """
+
+    def __init__(self):
+        self.project_hours = defaultdict(float)
+        self.daily = {}
+        self.rows = 0
+        self.rejected = 0
+
+    def add_rows(self, rows):
+        project_hours, daily = self.project_hours, self.daily
+        for row in rows:
+            try:
+                day = parse_log_day(row[0])
+                hours = float(row[3])
+            except (ValueError, IndexError):
+                self.rejected += 1
+                continue
+            self.rows += 1
+            project_hours[row[1]] += hours
+            projects = daily.get(day)
+            if projects is None:
+                projects = daily[day] = defaultdict(float)
+            projects[row[1]] += hours
+
+    def bucket_hours(self, granularity):
+        """Same shape as WorkLogStore.bucket_hours(granularity)."""
+        index = BUCKET_GRANULARITIES.index(granularity)
+        table = {}
+        for day in sorted(self.daily):
+            key = bucket_keys(day)[index]
+            projects = table.setdefault(key, defaultdict(float))
+            for project, hours in self.daily[day].items():
+                projects[project] += hours
+        return [(key, dict(projects)) for key, projects in table.items()]
+
+
+def stream_statistics(path, chunk_size=IMPORT_CHUNK_SIZE):
+    """Aggregate a log file and its archive into a StreamingStats, reading ``chunk_size`` rows at a time."""
+    stats = StreamingStats()
+
+    def add_file(file):
+        reader = csv.reader(file)
+        next(reader, None)
+        while True:
+            chunk = list(itertools.islice(reader, chunk_size))
+            if not chunk:
+                break
+            stats.add_rows(chunk)
+
+    for data_path in log_data_files(path):
+        with open_log_data(data_path) as file:
+            add_file(file)
+    return stats
+
+
+def figure_project_totals(project_hours_total):
+    if not project_hours_total:
+        return None
+    figure = plt.figure(figsize=(10, 6))
+    projects_sorted_names = sorted(project_hours_total.keys())
+    total_hrs_sorted = [project_hours_total[name] for name in projects_sorted_names]
+
+    plt.bar(projects_sorted_names, total_hrs_sorted, color='skyblue')
+    plt.title("Total Hours per Project")
+    plt.xlabel("Project")
+    plt.ylabel("Total Hours")
+    plt.xticks(rotation=45, ha="right")
+    plt.tight_layout()
+    return figure
+
+
+def figure_weekly_hours(weekly_buckets):
+    weekly_hours = dict(weekly_buckets)
+    if not weekly_hours:
+        return None
+    figure = plt.figure(figsize=(12, 7))
+    sorted_weeks = sorted(weekly_hours.keys())
+    all_projects_in_log = sorted(list(set(proj for week_data in weekly_hours.values() for proj in week_data)))
+
+    bottom_values = [0] * len(sorted_weeks)
+
+    for project_name in all_projects_in_log:
+        project_weekly_hours = [weekly_hours[week].get(project_name, 0) for week in sorted_weeks]
+        plt.bar(sorted_weeks, project_weekly_hours, bottom=bottom_values, label=project_name)
+        bottom_values = [b + h for b, h in zip(bottom_values, project_weekly_hours)]
+
+    plt.title("Weekly Hours per Project (Stacked)")
+    plt.xlabel("Week (YYYY-Www)")
+    plt.ylabel("Hours")
+    plt.xticks(rotation=70, ha="right")
+    plt.legend(title="Projects", bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.tight_layout()
+    plt.subplots_adjust(right=0.85)
+    return figure
+
+
+def figure_cumulative_hours(daily_buckets):
+    import matplotlib.dates as mdates
+
+    cumulative_per_project = defaultdict(list)
+    current_cumulative_totals = defaultdict(float)
+    for day, project_hours in daily_buckets:
+        for project, hours in project_hours.items():
+            current_cumulative_totals[project] += hours
+            cumulative_per_project[project].append((day, current_cumulative_totals[project]))
+    if not cumulative_per_project:
+        return None
+
+    figure = plt.figure(figsize=(12, 7))
+    projects_cumulative_sorted_names = sorted(cumulative_per_project.keys())
+    for project_name in projects_cumulative_sorted_names:
+        data_points = cumulative_per_project[project_name]
+        if data_points:
+            dates = [dp[0] for dp in data_points]
+            cum_hours = [dp[1] for dp in data_points]
+            plt.plot(dates, cum_hours, marker='o', linestyle='-', label=project_name)
+
+    plt.title("Cumulative Work Hours Over Time by Project")
+    plt.xlabel("Date")
+    plt.ylabel("Cumulative Hours")
+    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+    plt.gcf().autofmt_xdate(rotation=45)
+    plt.legend(title="Projects")
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    return figure
+
+
+def statistics_figures(project_hours_total, weekly_buckets, daily_buckets):
+    """The total, weekly stacked and cumulative figures as (kind, figure); charts without data are left out.
+
+    Bucket arguments are [(key, {project: hours})] lists in key order, as
+    returned by WorkLogStore.bucket_hours and StreamingStats.bucket_hours.
+    """
+    figures = zip(STATISTICS_CHARTS, (figure_project_totals(project_hours_total),
+                                      figure_weekly_hours(weekly_buckets),
+                                      figure_cumulative_hours(daily_buckets)))
+    return [(kind, figure) for kind, figure in figures if figure is not None]
+
+
+def figure_png(figure):
+    """Render a figure to PNG bytes and release it."""
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png")
+    plt.close(figure)
+    return buffer.getvalue()
+
+
+class ChartCache:
+    """LRU cache of rendered chart images.
+
+    Keys carry the log's content key, so a changed log simply misses.
+    Entries evicted from memory spill to ``directory`` and are read back
+    from there, also by later sessions restored from the snapshot.
+    """
+
+    def __init__(self, directory=CHART_CACHE_DIR, max_entries=CHART_CACHE_ENTRIES, max_disk_entries=CHART_CACHE_DISK_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.memory = OrderedDict()
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(repr(key).encode()).hexdigest() + ".png")
+
+    def get(self, key, render):
+        """Cached bytes for ``key``, calling ``render()`` only on a miss in memory and on disk."""
+        data = self.memory.pop(key, None)
+        if data is None:
+            try:
+                with open(self._path(key), 'rb') as file:
+                    data = file.read()
+                os.utime(self._path(key))
+            except OSError:
+                data = render()
+        self.memory[key] = data
+        while len(self.memory) > self.max_entries:
+            self.spill(*self.memory.popitem(last=False))
+        return data
+
+    def spill(self, key, data):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            atomic_write(self._path(key), lambda file: file.write(data), binary=True)
+            spilled = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".png")]
+            if len(spilled) > self.max_disk_entries:
+                spilled.sort(key=os.path.getmtime)
+                for path in spilled[:len(spilled) - self.max_disk_entries]:
+                    os.remove(path)
+        except OSError as e:
+            print(f"Warning: could not spill chart to {self.directory}: {e}")
+
+    def spill_all(self):
+        for key, data in self.memory.items():
+            self.spill(key, data)
+
+
+def write_statistics_pdf(filename, stats, charts=(), title="Work Statistics Report", label="Project"):
+    """Write the hours table for ``stats`` ({label value: hours}) to ``filename``.
+
+    ``charts`` are PNG images appended one per page after the table.
+    """
+    c = canvas.Canvas(filename, pagesize=LETTER)
+    width, height = LETTER
+
+    c.setFont("Helvetica-Bold", 18)
+    c.drawCentredString(width / 2.0, height - 50, title)
+
+    c.setFont("Helvetica", 10)
+    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    c.drawString(50, height - 75, f"Report Generated: {current_time}")
+
+    y_position = height - 120
+    line_height = 20
+
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(60, y_position, label)
+    c.drawString(300, y_position, "Total Hours")
+    y_position -= (line_height * 0.5)
+    c.line(50, y_position, width - 50, y_position)
+    y_position -= (line_height * 0.75)
+
+
+    c.setFont("Helvetica", 11)
+    total_overall_hours = 0
+    for project, hours in sorted(stats.items()):
+        if y_position < 60:
+            c.showPage()
+            c.setFont("Helvetica-Bold", 12)
+            c.drawString(60, height - 50, f"{label} (Continued)")
+            c.drawString(300, height-50, "Total Hours (Continued)")
+            y_position = height - 80
+            c.setFont("Helvetica", 11)
+
+
+        c.drawString(60, y_position, project)
+        c.drawString(300, y_position, f"{hours:.2f} hours")
+        total_overall_hours += hours
+        y_position -= line_height
+
+    y_position -= (line_height * 0.5)
+    c.line(50, y_position, width - 50, y_position)
+    y_position -= (line_height * 0.75)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(60, y_position, "Overall Total")
+    c.drawString(300, y_position, f"{total_overall_hours:.2f} hours")
+
+    for png in charts:
+        c.showPage()
+        image = ImageReader(io.BytesIO(png))
+        image_width, image_height = image.getSize()
+        scale = min((width - 100) / image_width, (height - 100) / image_height)
+        c.drawImage(image, 50, height - 50 - image_height * scale, image_width * scale, image_height * scale)
+
+    c.save()
+
+
+# === Event Bus: in-process notifications between features ===
+class EventBus:
+    """Synchronous publish/subscribe; handlers receive the event's keyword payload.
+
+    Events: "log-added" (row_ids), "log-edited" (deleted, updated),
+    "task-completed" (project, task, task_id), "project-renamed" (old_name, new_name).
+    """
+
+    def __init__(self):
+        self.handlers = defaultdict(list)
+
+    def subscribe(self, event, handler):
+        self.handlers[event].append(handler)
+
+    def publish(self, event, **payload):
+        for handler in list(self.handlers[event]):
+            handler(**payload)
+
+
+# === Achievement Rules: declarative conditions evaluated against the store's rollups ===
+# An automatic achievement names a measure ("type"), a "target", optionally a
+# "linked_to" project and, for window_hours, a "window" in days. Measures only
+# read tables that WorkLogStore and the task counts keep up to date, so a rule
+# check after a log costs a few dictionary lookups, not a pass over the log.
+ACHIEVEMENT_TYPES = ["counter", "streak", "longest_streak", "window_hours", "weekly_sessions",
+                     "daily_hours", "tasks_completed", "manual"]
+DEFAULT_ACHIEVEMENT_WINDOW = 7
+
+
+def _bucket_value(store, granularity, key, project, field):
+    """Hours (field 0) or rows (field 1) of a rollup bucket, summed over projects if ``project`` is None."""
+    projects = store.buckets[granularity].get(key)
+    if not projects:
+        return 0
+    if project is None:
+        return sum(bucket[field] for bucket in projects.values())
+    bucket = projects.get(project)
+    return bucket[field] if bucket else 0
+
+
+def measure_total_hours(store, task_counts, project, day, window):
+    if project is None:
+        return store.total
+    rollup = store.project_rollups.get(project)
+    return rollup["hours"] if rollup else 0.0
+
+
+def measure_streak(store, task_counts, project, day, window):
+    """Consecutive logged days ending on ``day``."""
+    return store.day_runs(project).streak_on(day)
+
+
+def measure_longest_streak(store, task_counts, project, day, window):
+    """Longest run of consecutive logged days so far."""
+    return store.day_runs(project).longest()
+
+
+def measure_window_hours(store, task_counts, project, day, window):
+    """Hours logged in the ``window`` days ending on ``day``."""
+    return store.window_hours(project, window, day)
+
+
+def measure_weekly_sessions(store, task_counts, project, day, window):
+    week_key = (store.day_keys.get(day) or bucket_keys(day))[1]
+    return _bucket_value(store, "week", week_key, project, 1)
+
+
+def measure_daily_hours(store, task_counts, project, day, window):
+    return _bucket_value(store, "day", day, project, 0)
+
+
+def measure_tasks_completed(store, task_counts, project, day, window):
+    if project is None:
+        return sum(counts["done"] for counts in task_counts.values())
+    return task_counts[project]["done"] if project in task_counts else 0
+
+
+ACHIEVEMENT_MEASURES = {
+    "counter": measure_total_hours,
+    "streak": measure_streak,
+    "longest_streak": measure_longest_streak,
+    "window_hours": measure_window_hours,
+    "weekly_sessions": measure_weekly_sessions,
+    "daily_hours": measure_daily_hours,
+    "tasks_completed": measure_tasks_completed,
+}
+
+
+def compile_achievement_rule(ach):
+    """An evaluator ``(store, task_counts, day) -> bool`` for an automatic achievement, or None."""
+    measure = ACHIEVEMENT_MEASURES.get(ach.get("type"))
+    target = ach.get("target")
+    if measure is None or target is None:
+        return None
+    project = ach.get("linked_to") or None
+    window = int(ach.get("window") or DEFAULT_ACHIEVEMENT_WINDOW)
+
+    def evaluate(store, task_counts, day):
+        return measure(store, task_counts, project, day, window) >= target
+    return evaluate
+
+
+# === Forecast: deadline feasibility from per-project velocity ===
+def parse_deadline(text):
+    """A task's deadline as a date; None when it is empty or not in DEADLINE_FORMAT."""
+    try:
+        return datetime.strptime(text.strip(), DEADLINE_FORMAT).date()
+    except ValueError:
+        return None
+
+
+def parse_estimate(text):
+    """A task's estimated effort in hours; None when it is empty, not a number or not positive."""
+    try:
+        estimate = float(text)
+    except ValueError:
+        return None
+    return estimate if math.isfinite(estimate) and estimate > 0 else None
+
+
+def velocity_series(store, project, end, days, window=VELOCITY_WINDOW):
+    """Rolling mean hours per day of ``project`` over ``window`` days, for the ``days`` days ending on ``end``.
+
+    Reads ``days + window - 1`` per-day buckets, never log rows; all the
+    windowed means come from one cumulative sum.
+    """
+    start = end - timedelta(days=days + window - 2)
+    day_table = store.buckets["day"]
+    daily = np.zeros(days + window - 1)
+    for offset in range(len(daily)):
+        bucket = day_table.get(start + timedelta(days=offset), {}).get(project)
+        if bucket is not None:
+            daily[offset] = bucket[0]
+    sums = np.concatenate(([0.0], np.cumsum(daily)))
+    return (sums[window:] - sums[:-window]) / window
+
+
+def forecast_tasks(tasks, velocities, task_hours, today):
+    """Projected completion of open tasks: {task_id: (remaining hours, projected date or None, status)}.
+
+    ``tasks`` maps task IDs to (project, deadline or None, estimated hours).
+    A project's velocity is spent on its tasks one after another, earliest
+    deadline first, so each projection includes the work queued before it.
+    """
+    queues = defaultdict(list)
+    for task_id, (project, deadline, _) in tasks.items():
+        queues[project].append((deadline or datetime.max.date(), task_id))
+    forecasts = {}
+    for project, queue in queues.items():
+        velocity = velocities.get(project, 0.0)
+        backlog = 0.0
+        for _, task_id in sorted(queue):
+            deadline, estimate = tasks[task_id][1], tasks[task_id][2]
+            remaining = max(estimate - task_hours.get(task_id, 0.0), 0.0)
+            backlog += remaining
+            projected = None
+            if not remaining:
+                projected = today
+            elif velocity > 0 and backlog / velocity <= FORECAST_HORIZON_DAYS:
+                projected = today + timedelta(days=math.ceil(backlog / velocity))
+            if deadline is None:
+                status = "No deadline"
+            elif deadline < today:
+                status = "Overdue"
+            elif projected is None or projected > deadline:
+                status = "At risk"
+            else:
+                status = "On track"
+            forecasts[task_id] = (remaining, projected, status)
+    return forecasts
+
+
+# === Batch Reports: one PDF per project and per month, rendered in a process pool ===
+# Workers share the parsed log through a read-only memory-mapped column file:
+#   header: COLUMNS_MAGIC, <III version/rows/name bytes, project names as JSON
+#   then, 8-byte aligned: int64 row offset per project (plus the end),
+#   float64 hours and int32 day ordinals, all rows sorted by (project, day).
+COLUMNS_MAGIC = b"WLCOLS"
+COLUMNS_VERSION = 1
+_COLUMNS_HEADER = struct.Struct("<III")
+
+
+def _align8(position):
+    return (position + 7) & ~7
+
+
+def write_log_columns(store, path):
+    """Write the valid rows of ``store``, archived years included, as a column file for batch report workers.
+
+    Archived years are read straight from their partitions rather than
+    loaded into the store, which would keep them in memory afterwards.
+    """
+    archived = (read_partition(partition_paths(store.path, year)[0]) for year in store.archived_years())
+    rows = []
+    for row in itertools.chain(store.entries.values(), itertools.chain.from_iterable(archived)):
+        try:
+            rows.append((row[1], parse_log_day(row[0]).toordinal(), float(row[3])))
+        except ValueError:
+            continue
+    rows.sort()
+    names = sorted({project for project, _, _ in rows})
+    offsets = array.array('q', [0])
+    for project, group in itertools.groupby(rows, key=operator.itemgetter(0)):
+        offsets.append(offsets[-1] + sum(1 for _ in group))
+    hours = array.array('d', (row[2] for row in rows))
+    days = array.array('i', (row[1] for row in rows))
+    names_json = json.dumps(names).encode('utf-8')
+
+    def write(file):
+        file.write(COLUMNS_MAGIC + _COLUMNS_HEADER.pack(COLUMNS_VERSION, len(rows), len(names_json)) + names_json)
+        file.write(b"\0" * (_align8(file.tell()) - file.tell()))
+        offsets.tofile(file)
+        hours.tofile(file)
+        days.tofile(file)
+    atomic_write(path, write, binary=True)
+    return names
+
+
+class LogColumns:
+    """Read-only view of a column file; the pages are shared between processes by the OS."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.mmap)
+        position = len(COLUMNS_MAGIC)
+        if bytes(view[:position]) != COLUMNS_MAGIC:
+            raise ValueError(f"{path} is not a log column file.")
+        version, rows, names_len = _COLUMNS_HEADER.unpack_from(view, position)
+        if version != COLUMNS_VERSION:
+            raise ValueError(f"{path} has unsupported version {version}.")
+        position += _COLUMNS_HEADER.size
+        self.names = json.loads(bytes(view[position:position + names_len]).decode('utf-8'))
+        position = _align8(position + names_len)
+        offsets_end = position + 8 * (len(self.names) + 1)
+        self.offsets = view[position:offsets_end].cast('q')
+        self.hours = view[offsets_end:offsets_end + 8 * rows].cast('d')
+        self.days = view[offsets_end + 8 * rows:offsets_end + 12 * rows].cast('i')
+
+    def project_range(self, project_index, first_day=None, end_day=None):
+        """Row range of a project, optionally limited to day ordinals in [first_day, end_day)."""
+        lo, hi = self.offsets[project_index], self.offsets[project_index + 1]
+        if first_day is not None:
+            lo = bisect.bisect_left(self.days, first_day, lo, hi)
+        if end_day is not None:
+            hi = bisect.bisect_left(self.days, end_day, lo, hi)
+        return lo, hi
+
+
+_open_columns = {} # Per worker process: column file path -> LogColumns
+
+
+def batch_report_chart(title, labels, values):
+    """PNG bar chart drawn without pyplot, so workers never touch a GUI backend."""
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(10, 6))
+    axes = figure.add_subplot()
+    axes.bar(labels, values, color='skyblue')
+    axes.set_title(title)
+    axes.set_ylabel("Hours")
+    axes.tick_params(axis='x', labelrotation=45)
+    figure.tight_layout()
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+def write_batch_report(column_path, kind, key, out_path):
+    """Worker: write the report for one project (kind "project") or one month ("month", key "YYYY-MM").
+
+    Returns (out_path, rows covered).
+    """
+    columns = _open_columns.get(column_path)
+    if columns is None:
+        columns = _open_columns[column_path] = LogColumns(column_path)
+    hours, days = columns.hours, columns.days
+    table = defaultdict(float)
+    rows = 0
+    if kind == "project":
+        lo, hi = columns.project_range(columns.names.index(key))
+        month_of_day = {}
+        for i in range(lo, hi):
+            month = month_of_day.get(days[i])
+            if month is None:
+                month = month_of_day[days[i]] = datetime.fromordinal(days[i]).strftime("%Y-%m")
+            table[month] += hours[i]
+        rows = hi - lo
+        title, label, chart_title = f"Project Report: {key}", "Month", f"Hours per Month: {key}"
+    else:
+        first = datetime.strptime(key, "%Y-%m")
+        end = (first + timedelta(days=32)).replace(day=1)
+        for project_index, project in enumerate(columns.names):
+            lo, hi = columns.project_range(project_index, first.toordinal(), end.toordinal())
+            if hi > lo:
+                table[project] = sum(hours[lo:hi])
+                rows += hi - lo
+        title, label, chart_title = f"Monthly Report: {key}", "Project", f"Hours per Project: {key}"
+    labels = sorted(table)
+    chart = batch_report_chart(chart_title, labels, [table[name] for name in labels])
+    write_statistics_pdf(out_path, table, [chart], title=title, label=label)
+    return out_path, rows
+
+
+def prepare_batch_reports(store, out_dir, kinds=("project", "month")):
+    """Write the column file and list the report jobs as write_batch_report arguments.
+
+    The caller removes the returned column file once the jobs are done.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    fd, column_path = tempfile.mkstemp(prefix="work_log.", suffix=".columns")
+    os.close(fd)
+    names = write_log_columns(store, column_path)
+    jobs = []
+    if "project" in kinds:
+        used = set()
+        for project in names:
+            safe_name = re.sub(r"[^\w.-]+", "_", project)
+            # Names changed by the cleanup, or equal to another ignoring case, get a hash of the real name.
+            if safe_name != project or safe_name.lower() in used:
+                safe_name += "_" + hashlib.sha256(project.encode('utf-8')).hexdigest()[:8]
+            used.add(safe_name.lower())
+            jobs.append((column_path, "project", project, os.path.join(out_dir, f"project_{safe_name}.pdf")))
+    if "month" in kinds:
+        for month, _ in store.bucket_hours("month"):
+            jobs.append((column_path, "month", month, os.path.join(out_dir, f"month_{month}.pdf")))
+    return column_path, jobs
+
+
+# === Local API: HTTP/JSON access for editor plugins and scripts ===
+def read_tasks(path=METADATA_FILE):
+    """Task Overview rows as dicts keyed by the lowercased column names."""
+    tasks = []
+    if not os.path.exists(path):
+        return tasks
+    with locked_file(path, shared=True):
+        with open(path, 'r', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if not header:
+                return tasks
+            for row in reader:
+                if len(row) >= 2:
+                    tasks.append({name.lower(): value for name, value in zip(header, row)})
+    return tasks
+
+
+def read_projects(path=PROJECTS_FILE):
+    """Names in the project list, as the GUI offers them."""
+    if not os.path.exists(path):
+        return set()
+    with locked_file(path, shared=True):
+        with open(path, 'r', newline='') as file:
+            return {row[0] for row in csv.reader(file) if row}
+
+
+def summary_data(store, project=None, today=None):
+    """Totals, streaks and per-project rollups, as served by GET /summary."""
+    today = today or datetime.now().date()
+    runs = store.day_runs(project)
+    if project is None:
+        data = {"total": store.total,
+                "today": store.per_day.get(today, 0.0),
+                "this_week": store.per_week.get(bucket_keys(today)[1], 0.0),
+                "this_year": store.per_year.get(today.year, 0.0),
+                "projects": {name: dict(store.project_rollup(name)) for name in sorted(store.project_rollups)}}
+    else:
+        rollup = store.project_rollup(project)
+        day_keys = bucket_keys(today)
+        data = {"project": project,
+                "total": rollup["hours"] if rollup else 0.0,
+                "entries": rollup["entries"] if rollup else 0,
+                "first": rollup["first"] if rollup else None,
+                "last": rollup["last"] if rollup else None,
+                "today": _bucket_value(store, "day", today, project, 0),
+                "this_week": _bucket_value(store, "week", day_keys[1], project, 0),
+                "this_year": _bucket_value(store, "year", today.year, project, 0)}
+    data["streak"] = {"current": runs.current(today), "longest": runs.longest()}
+    return data
+
+
+def api_log_values(entry, default_date):
+    """[date, project, task, hours] strings of one posted entry; ValueError if a field has the wrong JSON type."""
+    if not isinstance(entry, dict):
+        raise ValueError("entry must be a JSON object")
+    values = [entry.get("date") or default_date, entry.get("project", ""), entry.get("task", "")]
+    for name, value in zip(("date", "project", "task"), values):
+        if not isinstance(value, str):
+            raise ValueError(f"{name} must be a string")
+    hours = entry.get("hours", "")
+    if isinstance(hours, bool) or not isinstance(hours, (int, float, str)):
+        raise ValueError("hours must be a number")
+    return values + [str(hours)]
+
+
+class LocalApiServer:
+    """Minimal asyncio HTTP/JSON server over a WorkLogStore.
+
+    GET  /summary[?project=P]   totals, streaks and project rollups
+    GET  /tasks[?project=P]     Task Overview rows
+    POST /log                   {"project", "task", "hours", "date"?}
+    POST /logs                  {"entries": [...]} or a JSON list
+    Posted entries must name a project from the project list.
+    Appends from concurrent requests are gathered for API_FLUSH_DELAY and
+    written with one append_rows call; each request is answered once its
+    rows are on disk. ``sync`` is called to pick the rows up afterwards.
+    Requests must name this server in their Host header (against DNS
+    rebinding) and POST bodies must be sent as application/json, which a
+    web page cannot do cross-site without a preflight.
+    """
+
+    def __init__(self, store, sync, host=API_HOST, port=API_PORT):
+        self.store = store
+        self.sync = sync
+        self.host = host
+        self.port = port
+        self.loop = asyncio.new_event_loop()
+        self.server = None
+        self.pending = []
+        self.flush_handle = None
+        self.writes = 0
+
+    def start(self):
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self.handle_connection, self.host, self.port))
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def pump(self):
+        """Run whatever is ready on the event loop without blocking (for the Tk loop)."""
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+
+    def serve_forever(self):
+        self.loop.run_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.loop.run_until_complete(self.server.wait_closed())
+        if self.pending:
+            self.flush()
+        self.loop.close()
+
+    # --- Coalesced writes ---
+    def queue_rows(self, rows):
+        future = self.loop.create_future()
+        self.pending.append((rows, future))
+        if self.flush_handle is None:
+            self.flush_handle = self.loop.call_later(API_FLUSH_DELAY, self.flush)
+        return future
+
+    def flush(self):
+        self.flush_handle = None
+        pending, self.pending = self.pending, []
+        try:
+            append_rows(self.store.path, [row for rows, _ in pending for row in rows])
+        except OSError as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.writes += 1
+        for rows, future in pending:
+            if not future.done():
+                future.set_result(len(rows))
+        self.sync()
+
+    # --- HTTP ---
+    async def handle_connection(self, reader, writer):
+        try:
+            status, payload = await self.handle_request(reader)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, payload = 400, {"error": str(e) or "bad request"}
+        except OSError as e:
+            status, payload = 500, {"error": str(e)}
+        body = json.dumps(payload).encode('utf-8')
+        reason = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+                  415: "Unsupported Media Type", 500: "Internal Server Error"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('ascii') + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle_request(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            raise ValueError("malformed request line")
+        method, target, _ = request_line
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length > API_MAX_BODY:
+            raise ValueError("request body too large")
+        body = await reader.readexactly(length) if length else b""
+        if headers.get("host", "").lower() not in (f"127.0.0.1:{self.port}", f"localhost:{self.port}"):
+            return 403, {"error": "unexpected Host header"}
+        if method == "POST" and headers.get("content-type", "").partition(";")[0].strip().lower() != "application/json":
+            return 415, {"error": "Content-Type must be application/json"}
+
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        routes = {("GET", "/summary"): self.get_summary, ("GET", "/tasks"): self.get_tasks,
+                  ("POST", "/log"): self.post_log, ("POST", "/logs"): self.post_logs}
+        handler = routes.get((method, url.path))
+        if handler is None:
+            return (405, {"error": f"{method} not allowed"}) if url.path in {path for _, path in routes} else (404, {"error": "not found"})
+        if method == "POST":
+            try:
+                return await handler(json.loads(body or b"null"))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"invalid JSON: {e}")
+        if self.store.changed_on_disk():
+            self.sync()
+        return handler(query)
+
+    def get_summary(self, query):
+        return 200, summary_data(self.store, query.get("project"))
+
+    def get_tasks(self, query):
+        tasks = read_tasks()
+        if "project" in query:
+            tasks = [task for task in tasks if task.get("project") == query["project"]]
+        return 200, {"tasks": tasks}
+
+    async def post_log(self, entry):
+        return await self.post_logs([entry])
+
+    async def post_logs(self, entries):
+        if isinstance(entries, dict):
+            entries = entries.get("entries")
+        if not isinstance(entries, list) or not entries:
+            raise ValueError("expected a non-empty list of entries")
+        now = datetime.now().strftime(LOG_DATE_FORMAT)
+        projects = read_projects()
+        chunk, errors = [], []
+        for i, entry in enumerate(entries):
+            try:
+                values = api_log_values(entry, now)
+            except ValueError as e:
+                errors.append((i, str(e)))
+                continue
+            project = values[1].strip()
+            if project and project not in projects:
+                errors.append((i, f"unknown project '{project}'"))
+            else:
+                chunk.append((i, values))
+        valid, invalid = validate_import_chunk(chunk)
+        errors = sorted(errors + invalid)
+        if errors:
+            return 400, {"error": "invalid entries", "entries": [{"index": i, "reason": reason} for i, reason in errors]}
+        if not valid:
+            raise ValueError("no entries to log")
+        logged = await self.queue_rows(valid)
+        return 200, {"logged": logged}
+
+
 class WorkLoggerApp:
-    def __init__(self, root):
+    def __init__(self, root, api_port=None):
         self.root = root
         self.root.title("Work Planner with Task Overview & Achievements")
 
-        with open(PROJECTS_FILE, mode='r') as file:
-            reader = csv.reader(file)
-            self.projects = [row[0] for row in reader if row]
+        self.load_projects()
+
+        self.log_store = WorkLogStore(LOG_FILE, SNAPSHOT_FILE, index_search=True)
+        self.log_store.load()
+        self.task_links = load_task_links()
+        self.task_hours = defaultdict(float)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.log_watch_job = None
+        self.dirty_views = set()
+        self.dirty_task_ids = set()
+        self.pending_achievement_entries = []
+        self.refresh_job = None
+        self.events = EventBus()
+        self.events.subscribe("log-added", self.queue_achievement_check)
+        self.events.subscribe("task-completed", self.on_task_completed)
+        self.events.subscribe("project-renamed", self.on_project_renamed)
+        self.events.subscribe("log-added", self.queue_forecast)
+        self.forecast_inputs = {}
+        self.dirty_forecast_projects = None # None: every project
+        self.velocities = {}
+        self.forecast_day = None
+        self.chart_cache = ChartCache()
+        self.timer = None
+        self.timer_job = None
 
         self.notebook = ttk.Notebook(root)
         self.tab_logger = ttk.Frame(self.notebook)
         self.tab_overview = ttk.Frame(self.notebook)
         self.tab_achievements = ttk.Frame(self.notebook) # Added Achievements Tab
+        self.tab_heatmap = ttk.Frame(self.notebook)
+        self.tab_forecast = ttk.Frame(self.notebook)
 
         self.notebook.add(self.tab_logger, text="Work Logger")
         self.notebook.add(self.tab_overview, text="Task Overview")
         self.notebook.add(self.tab_achievements, text="Achievements") # Added Achievements Tab
+        self.notebook.add(self.tab_heatmap, text="Heatmap")
+        self.notebook.add(self.tab_forecast, text="Forecast")
         self.notebook.pack(expand=True, fill="both")
 
         self.build_logger_tab()
         self.build_overview_tab()
         self.build_achievements_tab() # Added call to build achievements tab
+        self.build_heatmap_tab()
+        self.build_forecast_tab()
         self.load_games_data() # Load achievement data at startup
+        self.watch_log_file()
+        if LINK_LEGACY_TASKS:
+            self.link_log_entries_to_tasks()
+        self.recover_timer()
+        self.api_server = None
+        self.api_job = None
+        if api_port is not None:
+            self.start_api_server(api_port)
+
+    # --- Local API: served from the Tk loop so it shares the in-memory stores ---
+    def start_api_server(self, port):
+        self.api_server = LocalApiServer(self.log_store, self.sync_log_file, port=port)
+        try:
+            self.api_server.start()
+        except OSError as e:
+            self.api_server.loop.close()
+            self.api_server = None
+            messagebox.showerror("API Error", f"Could not listen on {API_HOST}:{port}:\n{e}", parent=self.root)
+            return
+        self.root.title(f"{self.root.title()} (API on {API_HOST}:{self.api_server.port})")
+        self.pump_api_server()
+
+    def pump_api_server(self):
+        self.api_server.pump()
+        self.api_job = self.root.after(API_POLL_MS, self.pump_api_server)
 
     def build_logger_tab(self):
         tab = self.tab_logger
@@ -72,35 +2883,54 @@ class WorkLoggerApp:
         ttk.Label(tab, text="Task Description:").grid(row=1, column=0, sticky="w", padx=5, pady=2)
         self.task_entry = ttk.Entry(tab)
         self.task_entry.grid(row=1, column=1, sticky="ew", padx=5, pady=2)
+        self.build_task_autocomplete()
 
         ttk.Label(tab, text="Hours Worked:").grid(row=2, column=0, sticky="w", padx=5, pady=2)
         self.hours_entry = ttk.Entry(tab)
         self.hours_entry.grid(row=2, column=1, sticky="ew", padx=5, pady=2)
 
-        self.log_button = ttk.Button(tab, text="Log Work", command=self.log_work)
-        self.log_button.grid(row=3, column=0, columnspan=2, pady=10)
+        action_frame = ttk.Frame(tab)
+        action_frame.grid(row=3, column=0, columnspan=2, pady=10)
+        self.log_button = ttk.Button(action_frame, text="Log Work", command=self.log_work)
+        self.log_button.pack(side=tk.LEFT, padx=5)
+        self.timer_button = ttk.Button(action_frame, text="Start Timer", command=self.toggle_timer)
+        self.timer_button.pack(side=tk.LEFT, padx=5)
+        self.timer_label = ttk.Label(action_frame, text="")
+        self.timer_label.pack(side=tk.LEFT, padx=5)
+
+        self.build_log_search(tab)
 
         self.tree = ttk.Treeview(tab, columns=("Date", "Project", "Task", "Hours"), show="headings")
         for col in ("Date", "Project", "Task", "Hours"):
             self.tree.heading(col, text=col)
             self.tree.column(col, width=150)
-        self.tree.grid(row=4, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
+        self.tree.grid(row=5, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
 
         scrollbar = ttk.Scrollbar(tab, orient="vertical", command=self.tree.yview)
         self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.grid(row=4, column=2, sticky="ns")
+        scrollbar.grid(row=5, column=2, sticky="ns")
+
+        page_frame = ttk.Frame(tab)
+        page_frame.grid(row=6, column=0, columnspan=2, pady=2)
+        ttk.Button(page_frame, text="< Prev", command=lambda: self.render_log_page(self.log_page - 1)).pack(side=tk.LEFT, padx=5)
+        self.page_label = ttk.Label(page_frame, text="")
+        self.page_label.pack(side=tk.LEFT, padx=5)
+        ttk.Button(page_frame, text="Next >", command=lambda: self.render_log_page(self.log_page + 1)).pack(side=tk.LEFT, padx=5)
 
         btn_frame = ttk.Frame(tab)
-        btn_frame.grid(row=5, column=0, columnspan=2, pady=5)
+        btn_frame.grid(row=7, column=0, columnspan=2, pady=5)
 
         ttk.Button(btn_frame, text="Edit Selected", command=self.edit_selected).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Delete Selected", command=self.delete_selected).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Manage Projects", command=self.manage_projects_window).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Show Statistics", command=self.show_statistics).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Export Stats to PDF", command=self.export_statistics_to_pdf).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Batch Reports", command=self.batch_reports_window).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Import Logs", command=self.import_logs_window).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Archive Old Years", command=self.archive_old_years).pack(side=tk.LEFT, padx=5)
 
         self.summary_frame = ttk.LabelFrame(tab, text="Summary")
-        self.summary_frame.grid(row=6, column=0, columnspan=2, sticky="ew", padx=10, pady=10)
+        self.summary_frame.grid(row=8, column=0, columnspan=2, sticky="ew", padx=10, pady=10)
         self.today_label = ttk.Label(self.summary_frame, text="Today: 0 hrs")
         self.total_label = ttk.Label(self.summary_frame, text="Total: 0 hrs")
         self.year_label = ttk.Label(self.summary_frame, text="This Year: 0 hrs")
@@ -111,66 +2941,210 @@ class WorkLoggerApp:
         self.year_label.grid(row=0, column=2, padx=10, pady=2, sticky="w")
         self.week_label.grid(row=0, column=3, padx=10, pady=2, sticky="w")
         self.avg_label.grid(row=0, column=4, padx=10, pady=2, sticky="w")
+        self.streak_label = ttk.Label(self.summary_frame, text="Streak: 0 days")
+        self.project_streak_label = ttk.Label(self.summary_frame, text="")
+        self.streak_label.grid(row=1, column=0, columnspan=2, padx=10, pady=2, sticky="w")
+        self.project_streak_label.grid(row=1, column=2, columnspan=3, padx=10, pady=2, sticky="w")
 
         tab.grid_columnconfigure(1, weight=1)
-        tab.grid_rowconfigure(4, weight=1)
+        tab.grid_rowconfigure(5, weight=1)
 
         self.load_logs()
         self.update_summary()
 
-    def update_summary(self):
-        now = datetime.now()
-        year = now.year
-        week_number = now.isocalendar()[1]
-        week = f"{year}-W{week_number:02d}"
-        today_date = now.date()
-        stats = {
-            "total": 0.0,
-            "per_year": defaultdict(float),
-            "per_week": defaultdict(float),
-            "dates": set(),
-            "today": 0.0
-        }
-
-        if os.path.exists(LOG_FILE):
-            with open(LOG_FILE, mode='r', newline='') as file:
-                reader = csv.reader(file)
+    # --- Search: filter the log and page through the matches ---
+    def build_log_search(self, tab):
+        self.log_filters = None
+        self.visible_ids = []
+        self.log_page = 0
+        self.follow_log_tail = False
+
+        search_frame = ttk.LabelFrame(tab, text="Search")
+        search_frame.grid(row=4, column=0, columnspan=2, sticky="ew", padx=5, pady=2)
+        self.search_text_var = tk.StringVar()
+        self.search_project_var = tk.StringVar(value="All")
+        self.search_from_var = tk.StringVar()
+        self.search_to_var = tk.StringVar()
+        self.search_min_var = tk.StringVar()
+        self.search_max_var = tk.StringVar()
+
+        ttk.Label(search_frame, text="Text:").grid(row=0, column=0, sticky="w", padx=5, pady=2)
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_text_var)
+        search_entry.grid(row=0, column=1, columnspan=5, sticky="ew", padx=5, pady=2)
+        ttk.Label(search_frame, text="Project:").grid(row=0, column=6, sticky="w", padx=5, pady=2)
+        self.search_project_combo = ttk.Combobox(search_frame, textvariable=self.search_project_var,
+                                                 values=["All"] + self.projects, state="readonly", width=18)
+        self.search_project_combo.grid(row=0, column=7, sticky="ew", padx=5, pady=2)
+
+        fields = [("From:", self.search_from_var), ("To:", self.search_to_var),
+                  ("Min hours:", self.search_min_var), ("Max hours:", self.search_max_var)]
+        entries = [search_entry]
+        for i, (label_text, var) in enumerate(fields):
+            ttk.Label(search_frame, text=label_text).grid(row=1, column=2 * i, sticky="w", padx=5, pady=2)
+            entry = ttk.Entry(search_frame, textvariable=var, width=12)
+            entry.grid(row=1, column=2 * i + 1, sticky="ew", padx=5, pady=2)
+            entries.append(entry)
+        for entry in entries:
+            entry.bind("<Return>", lambda event: self.run_log_search())
+
+        ttk.Button(search_frame, text="Search", command=self.run_log_search).grid(row=2, column=0, columnspan=2, pady=2)
+        ttk.Button(search_frame, text="Clear", command=self.clear_log_search).grid(row=2, column=2, columnspan=2, pady=2)
+        self.search_result_label = ttk.Label(search_frame, text="Dates as YYYY-MM-DD.")
+        self.search_result_label.grid(row=2, column=4, columnspan=4, sticky="w", padx=5, pady=2)
+        search_frame.columnconfigure(1, weight=1)
+
+    def read_log_filters(self):
+        """Filters from the search fields, or None if they are invalid (the user has been told why)."""
+        filters = {"text": self.search_text_var.get().strip()}
+        project = self.search_project_var.get()
+        if project and project != "All":
+            filters["project"] = project
+        for key, var in (("date_from", self.search_from_var), ("date_to", self.search_to_var)):
+            value = var.get().strip()
+            if value:
                 try:
-                    next(reader)
-                except StopIteration:
-                    pass
-                for row in reader:
-                    try:
-                        date_obj = datetime.strptime(row[0], "%Y-%m-%d %H:%M")
-                        hours = float(row[3])
-                    except (ValueError, IndexError):
-                        continue
-
-                    stats["total"] += hours
-                    stats["dates"].add(date_obj.date())
-
-                    if date_obj.date() == today_date:
-                        stats["today"] += hours
+                    filters[key] = datetime.strptime(value, "%Y-%m-%d").date()
+                except ValueError:
+                    messagebox.showwarning("Input Error", "Dates must use the format YYYY-MM-DD.")
+                    return None
+        for key, var in (("min_hours", self.search_min_var), ("max_hours", self.search_max_var)):
+            value = var.get().strip()
+            if value:
+                try:
+                    filters[key] = float(value)
+                except ValueError:
+                    messagebox.showwarning("Input Error", "Hours must be a valid number.")
+                    return None
+        return filters
 
-                    y = date_obj.year
-                    wn = date_obj.isocalendar()[1]
-                    w = f"{y}-W{wn:02d}"
+    def run_log_search(self):
+        filters = self.read_log_filters()
+        if filters is None:
+            return
+        if len(filters) == 1 and not filters["text"]:
+            self.clear_log_search()
+            return
+        self.log_filters = filters
+        self.refresh_log_view(page=0)
+
+    def clear_log_search(self):
+        for var in (self.search_text_var, self.search_from_var, self.search_to_var,
+                    self.search_min_var, self.search_max_var):
+            var.set("")
+        self.search_project_var.set("All")
+        self.log_filters = None
+        self.refresh_log_view()
+
+    def refresh_log_view(self, page=None):
+        """Recompute the visible row IDs (all rows, or the search matches) and redraw one page.
+
+        Without a page the view jumps to the newest rows.
+        """
+        if self.log_filters is None:
+            self.visible_ids = list(self.log_store.entries)
+            self.search_result_label.config(text=f"{len(self.visible_ids)} entries.")
+        else:
+            started = time.perf_counter()
+            self.visible_ids = self.log_store.search(**self.log_filters)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.search_result_label.config(text=f"{len(self.visible_ids)} matches in {elapsed_ms:.1f} ms.")
+        self.render_log_page(self.last_log_page() if page is None else page)
+
+    def last_log_page(self):
+        return max(0, (len(self.visible_ids) - 1) // LOG_PAGE_SIZE)
+
+    def render_log_page(self, page):
+        """Show one LOG_PAGE_SIZE slice of ``visible_ids``; only these rows exist as tree items."""
+        self.log_page = min(max(page, 0), self.last_log_page())
+        start = self.log_page * LOG_PAGE_SIZE
+        page_ids = self.visible_ids[start:start + LOG_PAGE_SIZE]
+        self.tree.delete(*self.tree.get_children())
+        for row_id in page_ids:
+            self.tree.insert("", tk.END, iid=str(row_id), values=self.log_store.row(row_id))
+        if page_ids:
+            self.page_label.config(text=f"Rows {start + 1}-{start + len(page_ids)} of {len(self.visible_ids)}")
+        else:
+            self.page_label.config(text="No rows")
+
+    # --- Autocomplete: suggestions for the task description entry ---
+    def build_task_autocomplete(self):
+        self.task_index = PrefixIndex.from_task_rollups(self.log_store.task_rollups)
+        self.suggestion_box = tk.Listbox(self.tab_logger, height=6, activestyle="dotbox")
+        self.task_entry.bind("<KeyRelease>", self.on_task_entry_key)
+        self.task_entry.bind("<Down>", self.focus_task_suggestions)
+        self.task_entry.bind("<Escape>", lambda event: self.hide_task_suggestions())
+        self.task_entry.bind("<FocusOut>", lambda event: self.root.after(150, self.hide_task_suggestions_unless_focused))
+        self.suggestion_box.bind("<ButtonRelease-1>", self.accept_task_suggestion)
+        self.suggestion_box.bind("<Return>", self.accept_task_suggestion)
+        self.suggestion_box.bind("<Escape>", lambda event: (self.hide_task_suggestions(), self.task_entry.focus_set()))
+        self.project_combo.bind("<<ComboboxSelected>>", lambda event: (self.hide_task_suggestions(), self.schedule_refresh("summary")))
+
+    def on_task_entry_key(self, event):
+        if event.keysym in ("Down", "Up", "Return", "Escape", "Tab"):
+            return
+        suggestions = self.task_index.suggest(self.project_var.get(), self.task_entry.get())
+        if not suggestions:
+            self.hide_task_suggestions()
+            return
+        self.suggestion_box.delete(0, tk.END)
+        for text in suggestions:
+            self.suggestion_box.insert(tk.END, text)
+        self.suggestion_box.configure(height=len(suggestions))
+        self.suggestion_box.place(in_=self.task_entry, x=0, rely=1.0, relwidth=1.0)
+        self.suggestion_box.lift()
+
+    def focus_task_suggestions(self, event=None):
+        if self.suggestion_box.winfo_ismapped():
+            self.suggestion_box.focus_set()
+            self.suggestion_box.selection_clear(0, tk.END)
+            self.suggestion_box.selection_set(0)
+            self.suggestion_box.activate(0)
+        return "break"
+
+    def accept_task_suggestion(self, event=None):
+        selection = self.suggestion_box.curselection()
+        if selection:
+            self.task_entry.delete(0, tk.END)
+            self.task_entry.insert(0, self.suggestion_box.get(selection[0]))
+        self.hide_task_suggestions()
+        self.task_entry.focus_set()
+        self.task_entry.icursor(tk.END)
+        return "break"
+
+    def hide_task_suggestions(self):
+        self.suggestion_box.place_forget()
+
+    def hide_task_suggestions_unless_focused(self):
+        if self.root.focus_get() is not self.suggestion_box:
+            self.hide_task_suggestions()
 
-                    stats["per_year"][y] += hours
-                    stats["per_week"][w] += hours
+    def update_summary(self):
+        now = datetime.now()
+        year = now.year
+        week = bucket_keys(now.date())[1]
+        store = self.log_store
 
-        avg = stats["total"] / len(stats["dates"]) if stats["dates"] else 0
-        self.total_label.config(text=f"Total: {stats['total']:.1f} hrs")
-        self.year_label.config(text=f"This Year: {stats['per_year'].get(year, 0.0):.1f} hrs")
-        self.week_label.config(text=f"This Week: {stats['per_week'].get(week, 0.0):.1f} hrs")
+        avg = store.total / len(store.per_day) if store.per_day else 0
+        self.total_label.config(text=f"Total: {store.total:.1f} hrs")
+        self.year_label.config(text=f"This Year: {store.per_year.get(year, 0.0):.1f} hrs")
+        self.week_label.config(text=f"This Week: {store.per_week.get(week, 0.0):.1f} hrs")
         self.avg_label.config(text=f"Avg per day: {avg:.1f} hrs")
-        self.today_label.config(text=f"Today: {stats['today']:.1f} hrs")
+        self.today_label.config(text=f"Today: {store.per_day.get(now.date(), 0.0):.1f} hrs")
+
+        runs = store.day_runs()
+        self.streak_label.config(text=f"Streak: {runs.current(now.date())} days (best {runs.longest()})")
+        project = self.project_var.get()
+        if project:
+            runs = store.day_runs(project)
+            self.project_streak_label.config(text=f"{project} streak: {runs.current(now.date())} days (best {runs.longest()})")
+        else:
+            self.project_streak_label.config(text="")
 
     def build_overview_tab(self):
         tab = self.tab_overview
 
         # === Prize Feature: Add "Prize" to Treeview ===
-        cols = ("Priority", "Project", "Task", "Status", "Importance", "Urgency", "Deadline", "Prize")
+        cols = ("Priority", "Project", "Task", "Status", "Importance", "Urgency", "Deadline", "Prize", "Estimate", "Logged Hours")
         self.meta_tree = ttk.Treeview(tab, columns=cols, show="headings")
 
         for col in cols:
@@ -181,6 +3155,8 @@ class WorkLoggerApp:
         self.meta_tree.column("Task", width=200, anchor="w")
         self.meta_tree.column("Status", width=80, anchor="center")
         self.meta_tree.column("Prize", width=150, anchor="w")
+        self.meta_tree.column("Estimate", width=70, anchor="center")
+        self.meta_tree.column("Logged Hours", width=90, anchor="center")
 
         self.meta_tree.grid(row=0, column=0, columnspan=6, sticky="nsew", padx=5, pady=5)
         scrollbar = ttk.Scrollbar(tab, orient="vertical", command=self.meta_tree.yview)
@@ -196,7 +3172,7 @@ class WorkLoggerApp:
         self.meta_entries = {}
         rating_values = ["1", "2", "3", "4", "5"]
         # === Prize Feature: Add "Prize" to input labels ===
-        labels = ("Project", "Task", "Importance", "Urgency", "Deadline", "Prize")
+        labels = ("Project", "Task", "Importance", "Urgency", "Deadline", "Prize", "Estimate")
 
         for idx, label_text in enumerate(labels):
             ttk.Label(input_frame, text=label_text + ":").grid(row=0, column=idx, sticky="w", padx=5, pady=2)
@@ -220,6 +3196,7 @@ class WorkLoggerApp:
         ttk.Button(button_frame, text="Save Task", command=self.add_or_update_metadata).pack(side=tk.LEFT, padx=10)
         ttk.Button(button_frame, text="Delete Selected", command=self.delete_metadata_entry).pack(side=tk.LEFT, padx=10)
         ttk.Button(button_frame, text="Toggle Status", command=self.toggle_task_status).pack(side=tk.LEFT, padx=10)
+        ttk.Button(button_frame, text="Link Log Entries", command=self.link_log_entries_window).pack(side=tk.LEFT, padx=10)
         ttk.Checkbutton(button_frame, text="Hide Completed Tasks", variable=self.hide_completed_var, command=self.load_task_metadata).pack(side=tk.LEFT, padx=10)
 
         tab.grid_columnconfigure(0, weight=1)
@@ -242,39 +3219,26 @@ class WorkLoggerApp:
         project_name = selected_item['values'][1]
         task_name = selected_item['values'][2]
 
-        all_rows = []
-        header = []
         prize_to_claim = ""
         new_status_for_task = ""
+        task_id = ""
 
-        if os.path.exists(METADATA_FILE):
+        repair_task_layout()
+        with locked_file(METADATA_FILE):
             with open(METADATA_FILE, 'r', newline='') as file:
-                reader = csv.reader(file)
-                try:
-                    header = next(reader)
-                    all_rows.append(header)
-                    # Get column indices
-                    col_map = {name: idx for idx, name in enumerate(header)}
-                    
-                    for row in reader:
-                        if len(row) < len(header): continue
-                        if row[col_map["Project"]] == project_name and row[col_map["Task"]] == task_name:
-                            current_status = row[col_map["Status"]]
-                            new_status = "Done" if current_status in ["To-Do", ""] else "To-Do"
-                            row[col_map["Status"]] = new_status
-                            new_status_for_task = new_status
-                            # If task is now "Done", get the prize
-                            if new_status_for_task == "Done":
-                                prize_to_claim = row[col_map["Prize"]] if "Prize" in col_map else ""
-                        all_rows.append(row)
-                except (StopIteration, KeyError):
-                    pass
-
-        with open(METADATA_FILE, 'w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerows(all_rows)
+                all_rows = list(csv.reader(file))
+            for row in all_rows[1:]:
+                if row[META_PROJECT] == project_name and row[META_TASK] == task_name:
+                    row[META_STATUS] = new_status_for_task = "Done" if row[META_STATUS] == "To-Do" else "To-Do"
+                    task_id = row[META_ID]
+                    # If task is now "Done", get the prize
+                    if new_status_for_task == "Done":
+                        prize_to_claim = row[META_PRIZE]
+            atomic_write_rows(METADATA_FILE, all_rows)
 
         self.load_task_metadata()
+        if new_status_for_task == "Done":
+            self.events.publish("task-completed", project=project_name, task=task_name, task_id=task_id)
         
         # Show prize message box after updating the view
         if new_status_for_task == "Done" and prize_to_claim:
@@ -283,53 +3247,57 @@ class WorkLoggerApp:
     def load_task_metadata(self, sort_col="Priority", reverse=True):
         for row in self.meta_tree.get_children():
             self.meta_tree.delete(row)
+        # Open/done task counts per project, reused by the project rollups
+        self.task_counts = defaultdict(lambda: {"open": 0, "done": 0})
+        self.task_ids_by_name = {}
+        self.task_names_by_id = {}
+        self.forecast_inputs = {} # open tasks with an estimate: task_id -> (project, deadline, hours)
 
         if not os.path.exists(METADATA_FILE): return
+        repair_task_layout()
 
         all_tasks = []
+        hide_completed = self.hide_completed_var.get()
         with open(METADATA_FILE, mode='r', newline='') as file:
             reader = csv.reader(file)
-            try:
-                header = next(reader)
-                col_map = {name: idx for idx, name in enumerate(header)}
-                
-                # Handle old file format gracefully by assigning default values
-                status_idx = col_map.get("Status", -1)
-                prize_idx = col_map.get("Prize", -1)
-
-                for row in reader:
-                    if len(row) < 5: continue
+            next(reader, None)
+            # Rows are in METADATA_HEADER layout (see migrate_task_metadata).
+            for project, task, importance, urgency, deadline, status, prize, task_id, estimate in reader:
+                self.task_ids_by_name[(project, task.strip().lower())] = task_id
+                self.task_names_by_id[task_id] = (project, task)
+                self.task_counts[project]["done" if status == "Done" else "open"] += 1
+                estimated_hours = parse_estimate(estimate)
+                if status != "Done" and estimated_hours is not None:
+                    self.forecast_inputs[task_id] = (project, parse_deadline(deadline), estimated_hours)
+                if hide_completed and status == "Done":
+                    continue
 
-                    status = row[status_idx] if status_idx != -1 and len(row) > status_idx else "To-Do"
-                    if self.hide_completed_var.get() and status == "Done":
-                        continue
-                    
-                    try:
-                        importance = int(row[col_map["Importance"]])
-                        urgency = int(row[col_map["Urgency"]])
-                        priority = importance * urgency
-                    except (ValueError, IndexError):
-                        priority = 0
-
-                    # === Prize Feature: Load prize data ===
-                    prize = row[prize_idx] if prize_idx != -1 and len(row) > prize_idx else ""
-
-                    task_data = {
-                        "Priority": priority,
-                        "Project": row[col_map["Project"]],
-                        "Task": row[col_map["Task"]],
-                        "Status": status,
-                        "Importance": row[col_map["Importance"]],
-                        "Urgency": row[col_map["Urgency"]],
-                        "Deadline": row[col_map["Deadline"]],
-                        "Prize": prize
-                    }
-                    all_tasks.append(task_data)
-            except (StopIteration, ValueError, KeyError):
-                return
+                try:
+                    priority = int(importance) * int(urgency)
+                except ValueError:
+                    priority = 0
+
+                all_tasks.append({
+                    "Priority": priority,
+                    "Project": project,
+                    "Task": task,
+                    "Status": status,
+                    "Importance": importance,
+                    "Urgency": urgency,
+                    "Deadline": deadline,
+                    "Prize": prize, # === Prize Feature ===
+                    "Estimate": estimate,
+                    "ID": task_id
+                })
+
+        self.refresh_task_hours()
+        for task in all_tasks:
+            task["Logged Hours"] = round(self.task_hours.get(task["ID"], 0.0), 1)
 
-        if sort_col == "Priority":
+        if sort_col in ("Priority", "Logged Hours"):
             all_tasks.sort(key=lambda x: x.get(sort_col, 0), reverse=reverse)
+        elif sort_col == "Estimate":
+            all_tasks.sort(key=lambda x: parse_estimate(x["Estimate"]) or 0.0, reverse=reverse)
         else:
             all_tasks.sort(key=lambda x: str(x.get(sort_col, "")).lower(), reverse=reverse)
 
@@ -337,10 +3305,59 @@ class WorkLoggerApp:
             # === Prize Feature: Display prize in Treeview ===
             values = (
                 task["Priority"], task["Project"], task["Task"], task["Status"],
-                task["Importance"], task["Urgency"], task["Deadline"], task["Prize"]
+                task["Importance"], task["Urgency"], task["Deadline"], task["Prize"], task["Estimate"],
+                f"{task['Logged Hours']:.1f}"
             )
             tag = 'done' if task["Status"] == "Done" else ''
-            self.meta_tree.insert("", tk.END, values=values, tags=(tag,))
+            iid = task["ID"] if task["ID"] and not self.meta_tree.exists(task["ID"]) else None
+            self.meta_tree.insert("", tk.END, iid=iid, values=values, tags=(tag,))
+
+    # --- Task Links: per-task effort from linked log entries ---
+    def linked_task_id(self, project, description):
+        """Task ID a log description belongs to: an exact (case-insensitive) name match or a stored link."""
+        task_id = self.task_ids_by_name.get((project, description.strip().lower()))
+        if task_id is None:
+            task_id = self.task_links.get((project, description))
+        return task_id if task_id in self.task_names_by_id else None
+
+    def refresh_task_hours(self):
+        """Recompute per-task hours from the per-description rollup (one pass over distinct descriptions)."""
+        self.task_hours = defaultdict(float)
+        for (project, description), (hours, _, _) in self.log_store.task_rollups.items():
+            task_id = self.linked_task_id(project, description)
+            if task_id is not None:
+                self.task_hours[task_id] += hours
+        self.mark_forecast_dirty()
+
+    def update_task_hours_cells(self, task_ids):
+        for task_id in task_ids:
+            if self.meta_tree.exists(task_id):
+                self.meta_tree.set(task_id, "Logged Hours", f"{self.task_hours.get(task_id, 0.0):.1f}")
+
+    def link_log_entries_to_tasks(self):
+        """Indexed pass linking unmatched log descriptions to the closest task name of the same project."""
+        names_by_project = defaultdict(dict)
+        for (project, lowered_name), task_id in self.task_ids_by_name.items():
+            names_by_project[project][lowered_name] = task_id
+        candidate_lists = {project: list(names) for project, names in names_by_project.items()}
+
+        new_links = {}
+        for project, description in self.log_store.task_rollups:
+            if project not in names_by_project or self.linked_task_id(project, description) is not None:
+                continue
+            match = difflib.get_close_matches(description.strip().lower(), candidate_lists[project], n=1, cutoff=TASK_MATCH_CUTOFF)
+            if match:
+                new_links[(project, description)] = names_by_project[project][match[0]]
+        if new_links:
+            self.task_links.update(new_links)
+            save_task_links(self.task_links)
+            self.refresh_task_hours()
+            self.update_task_hours_cells(self.task_names_by_id)
+        return len(new_links)
+
+    def link_log_entries_window(self):
+        count = self.link_log_entries_to_tasks()
+        messagebox.showinfo("Link Log Entries", f"Linked {count} new log description(s) to tasks.", parent=self.root)
     
     # === Prize Feature: Save prize data ===
     def add_or_update_metadata(self):
@@ -350,52 +3367,33 @@ class WorkLoggerApp:
         urgency = self.meta_entries["Urgency"].get()
         deadline = self.meta_entries["Deadline"].get()
         prize = self.meta_entries["Prize"].get()
+        estimate = self.meta_entries["Estimate"].get().strip()
 
         if not project or not task:
             messagebox.showwarning("Missing Data", "Project and Task fields are required.")
             return
+        if estimate and parse_estimate(estimate) is None:
+            messagebox.showwarning("Input Error", "Estimate must be a positive number of hours.")
+            return
         
         new_entry_values_base = [project, task, importance, urgency, deadline]
 
-        all_rows = []
-        updated = False
-        original_status = "To-Do"
-        original_prize = prize
-
-        if os.path.exists(METADATA_FILE):
+        repair_task_layout()
+        with locked_file(METADATA_FILE):
             with open(METADATA_FILE, 'r', newline='') as file:
-                reader = csv.reader(file)
-                try:
-                    headers = next(reader)
-                    all_rows.append(headers)
-                    if "Status" not in headers: headers.append("Status")
-                    if "Prize" not in headers: headers.append("Prize")
-                    
-                    col_map = {name: idx for idx, name in enumerate(headers)}
-                    status_idx = col_map.get("Status")
-                    prize_idx = col_map.get("Prize")
-
-                    for row in reader:
-                        if len(row) >= 2 and row[0] == project and row[1] == task:
-                            original_status = row[status_idx] if status_idx is not None and len(row) > status_idx else "To-Do"
-                            # If user doesn't enter a new prize, keep the old one on update
-                            if prize == "":
-                                original_prize = row[prize_idx] if prize_idx is not None and len(row) > prize_idx else ""
-                            updated = True
-                        else:
-                            all_rows.append(row)
-                except StopIteration:
-                    if not all_rows:
-                        all_rows.append(["Project", "Task", "Importance", "Urgency", "Deadline", "Status", "Prize"])
-        else:
-            all_rows.append(["Project", "Task", "Importance", "Urgency", "Deadline", "Status", "Prize"])
-
-        final_entry = new_entry_values_base + [original_status, original_prize]
-        all_rows.append(final_entry)
-
-        with open(METADATA_FILE, 'w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerows(all_rows)
+                all_rows = list(csv.reader(file))
+            existing = next((row for row in all_rows[1:] if row[META_PROJECT] == project and row[META_TASK] == task), None)
+            if existing is None:
+                next_id = max((int(row[META_ID]) for row in all_rows[1:]), default=0) + 1
+                all_rows.append(new_entry_values_base + ["To-Do", prize, str(next_id), estimate])
+            else:
+                existing[:META_STATUS] = new_entry_values_base
+                # If user doesn't enter a new prize or estimate, keep the old one on update
+                if prize:
+                    existing[META_PRIZE] = prize
+                if estimate:
+                    existing[META_ESTIMATE] = estimate
+            atomic_write_rows(METADATA_FILE, all_rows)
 
         self.load_task_metadata()
         for entry_widget in self.meta_entries.values():
@@ -411,40 +3409,95 @@ class WorkLoggerApp:
         project_to_delete = selected_item['values'][1]
         task_to_delete = selected_item['values'][2]
 
-        rows_to_keep = []
-        header = []
-        if os.path.exists(METADATA_FILE):
+        repair_task_layout()
+        with locked_file(METADATA_FILE):
             with open(METADATA_FILE, 'r', newline='') as file:
-                reader = csv.reader(file)
-                try:
-                    header = next(reader)
-                    for row in reader:
-                        if len(row) >= 2:
-                            if not (row[0] == project_to_delete and row[1] == task_to_delete):
-                                rows_to_keep.append(row)
-                except StopIteration:
-                    pass
-
-        with open(METADATA_FILE, 'w', newline='') as file:
-            writer = csv.writer(file)
-            if header:
-                writer.writerow(header)
-            writer.writerows(rows_to_keep)
+                rows = list(csv.reader(file))
+            atomic_write_rows(METADATA_FILE, rows[:1] + [
+                row for row in rows[1:] if not (row[META_PROJECT] == project_to_delete and row[META_TASK] == task_to_delete)])
         self.load_task_metadata()
 
     def load_logs(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-        if not os.path.exists(LOG_FILE): return
-        with open(LOG_FILE, mode='r', newline='') as file:
-            reader = csv.reader(file)
-            try:
-                next(reader) 
-                for row in reader:
-                    if len(row) == 4:
-                        self.tree.insert("", tk.END, values=row)
-            except StopIteration:
-                pass
+        self.refresh_log_view()
+
+    # --- Tail Following: pick up rows appended by other programs ---
+    def watch_log_file(self):
+        # Our own writes sync right away, so a change seen here was made by another program;
+        # the prefix is rehashed (a read, no parse) in case it also edited earlier rows.
+        if self.log_store.changed_on_disk():
+            self.sync_log_file(verify_prefix=True)
+        self.log_watch_job = self.root.after(LOG_POLL_INTERVAL_MS, self.watch_log_file)
+
+    def sync_log_file(self, verify_prefix=False):
+        """Feed rows appended to LOG_FILE into the views; fully reload only after a rewrite."""
+        new_ids = self.log_store.sync(verify_prefix)
+        if new_ids is None:
+            self.reload_log_views()
+            return
+        self.show_appended_rows(new_ids)
+
+    def reload_log_views(self):
+        """Redraw everything derived from the log after the store was rebuilt with new row IDs."""
+        self.task_index = PrefixIndex.from_task_rollups(self.log_store.task_rollups)
+        self.refresh_task_hours()
+        self.follow_log_tail = True
+        self.dirty_task_ids.update(self.task_names_by_id)
+        self.schedule_refresh("log", "summary", "task_hours", "heatmap")
+
+    def show_appended_rows(self, new_ids):
+        if not new_ids:
+            return
+        entries = self.log_store.entries
+        touched_tasks = set()
+        self.mark_log_view_dirty()
+        for row_id in new_ids:
+            row = entries[row_id]
+            self.task_index.add(row[1], row[2], row[0])
+            task_id = self.linked_task_id(row[1], row[2])
+            if task_id is not None:
+                try:
+                    parse_log_day(row[0])
+                    self.task_hours[task_id] += float(row[3])
+                except ValueError:
+                    continue
+                touched_tasks.add(task_id)
+        self.dirty_task_ids.update(touched_tasks)
+        self.schedule_refresh("summary", "task_hours", "heatmap")
+        self.events.publish("log-added", row_ids=new_ids)
+
+    # --- Refresh Scheduler: redraw each dirty view once when Tk is idle ---
+    def schedule_refresh(self, *views):
+        """Mark views dirty; a burst of changes is drawn by a single run_refresh."""
+        self.dirty_views.update(views)
+        if self.refresh_job is None:
+            self.refresh_job = self.root.after_idle(self.run_refresh)
+
+    def mark_log_view_dirty(self):
+        # Follow the newest rows only if the user was already looking at them.
+        if self.log_page == self.last_log_page():
+            self.follow_log_tail = True
+        self.schedule_refresh("log")
+
+    def run_refresh(self):
+        self.refresh_job = None
+        dirty, self.dirty_views = self.dirty_views, set()
+        if "log" in dirty:
+            self.refresh_log_view(None if self.follow_log_tail else self.log_page)
+            self.follow_log_tail = False
+        if "summary" in dirty:
+            self.update_summary()
+        if "task_hours" in dirty:
+            task_ids, self.dirty_task_ids = self.dirty_task_ids, set()
+            self.update_task_hours_cells(task_ids)
+        if "achievement_check" in dirty:
+            logged_entries, self.pending_achievement_entries = self.pending_achievement_entries, []
+            self.check_achievements_for_entries(logged_entries)
+        if "achievements" in dirty:
+            self.on_game_selected()
+        if "heatmap" in dirty:
+            self.update_heatmap()
+        if "forecast" in dirty:
+            self.update_forecast()
 
     def log_work(self):
         project = self.project_var.get()
@@ -467,60 +3520,227 @@ class WorkLoggerApp:
             messagebox.showwarning("Input Error", "Hours must be a valid number.")
             return
 
-        with open(LOG_FILE, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([date_str, project, task, f"{hours:.2f}"])
+        append_rows(LOG_FILE, [[date_str, project, task, f"{hours:.2f}"]])
 
         self.task_entry.delete(0, tk.END)
         self.hours_entry.delete(0, tk.END)
-        self.load_logs()
-        self.update_summary()
-        self.check_achievements_on_log(project, date_str)
+        self.sync_log_file()
         messagebox.showinfo("Logged", f"Work logged for {project}.")
 
 
-    def delete_selected(self):
-        selected_item_ids = self.tree.selection()
-        if not selected_item_ids:
-            messagebox.showwarning("No selection", "Please select a log entry to delete.")
+    # --- Timer: time a task live and log it as one row on stop ---
+    def toggle_timer(self):
+        if self.timer is None:
+            self.start_timer()
+        else:
+            self.stop_timer()
+
+    def start_timer(self, timer=None):
+        if timer is None:
+            project = self.project_var.get()
+            task = self.task_entry.get()
+            if not project or not task:
+                messagebox.showwarning("Input Error", "Please select a project and enter a task description.")
+                return
+            timer = {"project": project, "task": task, "started": time.time()}
+        try:
+            save_timer_journal(timer)
+        except OSError as e:
+            messagebox.showerror("Timer Error", f"Could not write {TIMER_JOURNAL_FILE}:\n{e}")
+            return
+        self.timer = timer
+        self.timer_button.config(text="Stop Timer")
+        self.tick_timer()
+
+    def tick_timer(self):
+        """Redraw the elapsed time each second; write the journal every TIMER_CHECKPOINT_SECONDS."""
+        now = time.time()
+        elapsed = int(now - self.timer["started"])
+        self.timer_label.config(text=f"{self.timer['project']}: {self.timer['task']}  "
+                                     f"{elapsed // 3600:02d}:{elapsed % 3600 // 60:02d}:{elapsed % 60:02d}")
+        if now - self.timer["checkpoint"] >= TIMER_CHECKPOINT_SECONDS:
+            try:
+                save_timer_journal(self.timer)
+            except OSError as e:
+                print(f"Warning: could not checkpoint timer: {e}")
+        self.timer_job = self.root.after(TIMER_TICK_MS, self.tick_timer)
+
+    def stop_timer(self, log=True, ended=None):
+        """Stop the timer and, if ``log``, append its hours as one row (timestamped at the start)."""
+        if self.timer_job is not None:
+            self.root.after_cancel(self.timer_job)
+            self.timer_job = None
+        timer, self.timer = self.timer, None
+        self.timer_button.config(text="Start Timer")
+        self.timer_label.config(text="")
+        hours = ((ended or time.time()) - timer["started"]) / 3600
+        if log:
+            if round(hours, 2) <= 0:
+                messagebox.showinfo("Timer", "The timer ran for less than a minute; nothing was logged.")
+            else:
+                date_str = datetime.fromtimestamp(timer["started"]).strftime(LOG_DATE_FORMAT)
+                append_rows(LOG_FILE, [[date_str, timer["project"], timer["task"], f"{hours:.2f}"]])
+                self.sync_log_file()
+                messagebox.showinfo("Logged", f"Logged {hours:.2f} hours for {timer['project']}.")
+        clear_timer_journal()
+
+    def recover_timer(self):
+        """Offer to log, resume or discard a timer left running by a session that crashed."""
+        timer = load_timer_journal()
+        if timer is None:
+            return
+        checkpoint_hours = (timer["checkpoint"] - timer["started"]) / 3600
+        answer = messagebox.askyesnocancel(
+            "Recover Timer",
+            f"A timer for {timer['project']}: {timer['task']} was still running when the planner closed "
+            f"({checkpoint_hours:.2f} hours at its last checkpoint).\n\n"
+            "Yes: log those hours now\nNo: keep the timer running from there (the time the planner "
+            "was closed is not counted)\nCancel: discard it", parent=self.root)
+        if answer is None:
+            clear_timer_journal()
+        elif answer:
+            self.timer = timer
+            self.stop_timer(ended=timer["checkpoint"])
+        else:
+            # Resume from the checkpoint: the time between the crash and now is not work.
+            timer["started"] += time.time() - timer["checkpoint"]
+            self.start_timer(timer)
+
+    def import_logs_window(self):
+        source_path = filedialog.askopenfilename(
+            parent=self.root, title="Import Work Logs",
+            filetypes=[("CSV files", "*.csv"), ("JSON lines", "*.jsonl *.ndjson *.json"), ("All files", "*.*")])
+        if not source_path:
+            return
+        try:
+            columns = peek_import_columns(source_path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Import Error", f"Could not read {source_path}:\n{e}", parent=self.root)
             return
 
-        selected_values_to_delete = [self.tree.item(item_id)["values"] for item_id in selected_item_ids]
+        win = tk.Toplevel(self.root)
+        win.title("Import Work Logs")
+        win.transient(self.root)
+        win.grab_set()
 
-        all_rows = []
-        header = []
-        if os.path.exists(LOG_FILE):
-            with open(LOG_FILE, 'r', newline='') as file:
-                reader = csv.reader(file)
-                try:
-                    header = next(reader)
-                    for row in reader:
-                        is_selected_for_deletion = False
-                        for sel_val_list in selected_values_to_delete:
-                            if [str(x) for x in row] == [str(x) for x in sel_val_list]:
-                                is_selected_for_deletion = True
-                                break
-                        if not is_selected_for_deletion:
-                            all_rows.append(row)
-                except StopIteration:
-                    pass
-
-        with open(LOG_FILE, 'w', newline='') as file:
-            writer = csv.writer(file)
-            if header:
-                writer.writerow(header)
-            writer.writerows(all_rows)
+        ttk.Label(win, text=os.path.basename(source_path)).grid(row=0, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        column_vars = {}
+        lowered = {c.lower(): c for c in columns}
+        for i, field in enumerate(LOG_HEADER, start=1):
+            ttk.Label(win, text=f"{field} column:").grid(row=i, column=0, sticky="w", padx=5, pady=2)
+            var = tk.StringVar(win, value=lowered.get(field.lower(), ""))
+            ttk.Combobox(win, textvariable=var, values=columns, state="readonly", width=28).grid(row=i, column=1, sticky="ew", padx=5, pady=2)
+            column_vars[field] = var
+
+        ttk.Label(win, text="Date format:").grid(row=len(LOG_HEADER) + 1, column=0, sticky="w", padx=5, pady=2)
+        date_format_var = tk.StringVar(win, value=LOG_DATE_FORMAT)
+        ttk.Entry(win, textvariable=date_format_var, width=30).grid(row=len(LOG_HEADER) + 1, column=1, sticky="ew", padx=5, pady=2)
+        win.columnconfigure(1, weight=1)
+
+        def run_import():
+            column_map = {field: var.get() for field, var in column_vars.items()}
+            if not all(column_map.values()):
+                messagebox.showwarning("Input Error", "Please map every field to a column.", parent=win)
+                return
+            try:
+                result = import_work_logs(source_path, column_map, date_format_var.get() or LOG_DATE_FORMAT)
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Import Error", str(e), parent=win)
+                return
+            win.destroy()
+
+            new_projects = sorted(result["projects"] - set(self.projects))
+            if new_projects and messagebox.askyesno(
+                    "New Projects", "The import references projects that are not in your list:\n\n"
+                    + "\n".join(new_projects[:20]) + "\n\nAdd them?", parent=self.root):
+                self.projects = sorted(self.projects + new_projects)
+                if self.save_projects():
+                    self.project_combo['values'] = self.projects
+                    self.search_project_combo['values'] = ["All"] + self.projects
+
+            self.sync_log_file()
+            message = f"Imported {result['imported']} rows."
+            if result["rejected"]:
+                message += f"\nRejected {result['rejected']} rows:\n" + "\n".join(
+                    f"line {line}: {reason}" for line, reason in result["errors"][:10])
+            messagebox.showinfo("Import Finished", message, parent=self.root)
+
+        ttk.Button(win, text="Import", command=run_import).grid(row=len(LOG_HEADER) + 2, column=0, columnspan=2, pady=10)
+
+    # --- Batch Operations: ID-based edits applied with one rewrite of the log ---
+    def selected_log_ids(self):
+        """Selected live rows; archived rows found by a search are read-only."""
+        selected = [int(item_id) for item_id in self.tree.selection()]
+        live = [row_id for row_id in selected if not self.log_store.is_archived(row_id)]
+        if len(live) < len(selected):
+            messagebox.showwarning("Archived Rows", "Archived rows are read-only and were left out of the selection.",
+                                   parent=self.root)
+        return live
+
+    def archive_old_years(self):
+        """Move the rows of every year before the current one into the compressed archive."""
+        year = datetime.now().year
+        if not messagebox.askyesno("Archive Old Years",
+                                   f"Move all log entries dated before {year} into the archive?\n"
+                                   "Archived entries still count in every summary and can be searched, "
+                                   "but are read-only.", parent=self.root):
+            return
+        try:
+            with locked_file(LOG_FILE):
+                moved = self.log_store.archive_closed_years(year)
+        except ConcurrentModificationError as e:
+            self.handle_concurrent_modification(e)
+            return
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not archive the log: {e}", parent=self.root)
+            return
+        if not moved:
+            messagebox.showinfo("Archive Old Years", "There are no entries to archive.", parent=self.root)
+            return
+        self.reload_log_views()
+        messagebox.showinfo("Archive Old Years", "Archived " + ", ".join(
+            f"{count} entries from {archived_year}" for archived_year, count in moved.items()) + ".", parent=self.root)
 
-        self.load_logs()
-        self.update_summary()
+    def apply_log_batch(self, deletes=(), updates=None):
+        """Apply deletes/updates by row ID as one transaction and refresh only the affected rows."""
+        updates = updates or {}
+        try:
+            with locked_file(LOG_FILE):
+                new_ids = self.log_store.apply_batch(deletes, updates)
+        except ConcurrentModificationError as e:
+            self.handle_concurrent_modification(e)
+            return False
+
+        # Rows appended by others first, so the rebuilds below count them once.
+        self.show_appended_rows(new_ids)
+        # Rebuilt rather than patched: deletes and edits change use counts and latest timestamps.
+        self.task_index = PrefixIndex.from_task_rollups(self.log_store.task_rollups)
+        self.refresh_task_hours()
+        self.dirty_task_ids.update(self.task_names_by_id)
+        self.schedule_refresh("log", "summary", "task_hours", "heatmap")
+        self.events.publish("log-edited", deleted=list(deletes), updated=list(updates))
+        return True
+
+    def delete_selected(self):
+        selected_ids = self.selected_log_ids()
+        if not selected_ids:
+            messagebox.showwarning("No selection", "Please select a log entry to delete.")
+            return
+        if len(selected_ids) > 1 and not messagebox.askyesno(
+                "Confirm Delete", f"Delete {len(selected_ids)} log entries?", parent=self.root):
+            return
+        self.apply_log_batch(deletes=selected_ids)
 
     def edit_selected(self):
-        selected_item_id = self.tree.selection()
-        if not selected_item_id:
+        selected_ids = self.selected_log_ids()
+        if not selected_ids:
             messagebox.showwarning("No selection", "Please select a log entry to edit.")
             return
-        item_id = selected_item_id[0]
-        old_values = self.tree.item(item_id)["values"]
+        if len(selected_ids) > 1:
+            self.batch_edit_window(selected_ids)
+            return
+        row_id = selected_ids[0]
+        old_values = self.log_store.entries[row_id]
 
         edit_win = tk.Toplevel(self.root)
         edit_win.title("Edit Log Entry")
@@ -569,48 +3789,202 @@ class WorkLoggerApp:
                 messagebox.showerror("Input Error", "Hours must be a valid number.", parent=edit_win)
                 return
 
-            all_rows = []
-            header = []
-            if os.path.exists(LOG_FILE):
-                with open(LOG_FILE, 'r', newline='') as file:
-                    reader = csv.reader(file)
-                    try:
-                        header = next(reader)
-                        for line_values in reader:
-                            if [str(x) for x in line_values] == [str(x) for x in old_values]:
-                                all_rows.append(new_values)
-                            else:
-                                all_rows.append(line_values)
-                    except StopIteration:
-                        pass
-            else:
-                messagebox.showerror("Error", "Log file not found.", parent=edit_win)
-                return
-
-
-            with open(LOG_FILE, 'w', newline='') as file:
-                writer = csv.writer(file)
-                if header:
-                    writer.writerow(header)
-                writer.writerows(all_rows)
-
-            self.load_logs()
-            self.update_summary()
             edit_win.destroy()
-            messagebox.showinfo("Success", "Log entry updated successfully.")
+            if self.apply_log_batch(updates={row_id: new_values}):
+                messagebox.showinfo("Success", "Log entry updated successfully.")
 
         save_button = ttk.Button(edit_win, text="Save", command=save_edit)
         save_button.grid(row=len(labels), column=0, columnspan=2, pady=10)
         cancel_button = ttk.Button(edit_win, text="Cancel", command=edit_win.destroy)
         cancel_button.grid(row=len(labels), column=1, sticky='e', padx=5, pady=10)
 
+    def batch_edit_window(self, row_ids):
+        edit_win = tk.Toplevel(self.root)
+        edit_win.title(f"Edit {len(row_ids)} Log Entries")
+        edit_win.transient(self.root)
+        edit_win.grab_set()
+
+        unchanged = "(unchanged)"
+        ttk.Label(edit_win, text="Project:").grid(row=0, column=0, sticky="w", padx=5, pady=2)
+        project_var = tk.StringVar(edit_win, value=unchanged)
+        ttk.Combobox(edit_win, textvariable=project_var, values=[unchanged] + self.projects,
+                     state="readonly", width=28).grid(row=0, column=1, columnspan=2, sticky="ew", padx=5, pady=2)
+
+        ttk.Label(edit_win, text="Hours:").grid(row=1, column=0, sticky="w", padx=5, pady=2)
+        hours_mode_var = tk.StringVar(edit_win, value=unchanged)
+        ttk.Combobox(edit_win, textvariable=hours_mode_var, values=[unchanged, "set to", "add"],
+                     state="readonly", width=12).grid(row=1, column=1, sticky="w", padx=5, pady=2)
+        hours_var = tk.StringVar(edit_win)
+        ttk.Entry(edit_win, textvariable=hours_var, width=14).grid(row=1, column=2, sticky="ew", padx=5, pady=2)
+        edit_win.columnconfigure(2, weight=1)
+
+        def save_batch():
+            project = project_var.get()
+            hours_mode = hours_mode_var.get()
+            delta = 0.0
+            if hours_mode != unchanged:
+                try:
+                    delta = float(hours_var.get())
+                except ValueError:
+                    messagebox.showerror("Input Error", "Hours must be a valid number.", parent=edit_win)
+                    return
+
+            updates = {}
+            for row_id in row_ids:
+                row = self.log_store.entries.get(row_id)
+                if row is None:
+                    # The log was reloaded while the dialog was open.
+                    edit_win.destroy()
+                    self.handle_concurrent_modification(
+                        ConcurrentModificationError(f"Entries of {LOG_FILE} were changed by another program."))
+                    return
+                new_values = list(row)
+                if project != unchanged:
+                    new_values[1] = project
+                if hours_mode != unchanged:
+                    try:
+                        hours = delta if hours_mode == "set to" else float(row[3]) + delta
+                    except ValueError:
+                        hours = delta
+                    if hours <= 0:
+                        messagebox.showerror("Input Error", f"Hours would not be positive for the entry '{row[2]}' ({row[0]}).", parent=edit_win)
+                        return
+                    new_values[3] = f"{hours:.2f}"
+                if new_values != row:
+                    updates[row_id] = new_values
+
+            edit_win.destroy()
+            if updates and self.apply_log_batch(updates=updates):
+                messagebox.showinfo("Success", f"{len(updates)} log entries updated.")
+
+        ttk.Button(edit_win, text="Save", command=save_batch).grid(row=2, column=0, columnspan=2, pady=10)
+        ttk.Button(edit_win, text="Cancel", command=edit_win.destroy).grid(row=2, column=2, sticky='e', padx=5, pady=10)
+
+
+    def project_summary(self, project):
+        """Everything referencing ``project``: logged work, tasks and linked achievements."""
+        rollup = self.log_store.project_rollup(project) or {"hours": 0.0, "entries": 0, "first": None, "last": None}
+        tasks = self.task_counts.get(project, {"open": 0, "done": 0})
+        achievements = self.achievements_by_project.get(project, [])
+        return dict(rollup, open_tasks=tasks["open"], done_tasks=tasks["done"],
+                    achievements=len(achievements),
+                    unlocked_achievements=sum(1 for ach in achievements if ach.get("unlocked")))
+
+    def describe_project(self, project):
+        summary = self.project_summary(project)
+        lines = [f"{summary['hours']:.1f} hrs in {summary['entries']} entries"]
+        if summary["entries"]:
+            lines.append(f"First: {summary['first']}   Last: {summary['last']}")
+        lines.append(f"Tasks: {summary['open_tasks']} open, {summary['done_tasks']} done")
+        lines.append(f"Achievements: {summary['achievements']} linked, {summary['unlocked_achievements']} unlocked")
+        return "\n".join(lines)
+
+    def load_projects(self):
+        with locked_file(PROJECTS_FILE, shared=True):
+            with open(PROJECTS_FILE, mode='r') as file:
+                reader = csv.reader(file)
+                self.projects = [row[0] for row in reader if row]
+            self.projects_version = file_version(PROJECTS_FILE)
+
+    def save_projects(self):
+        """Write self.projects unless another program changed the file since we read it."""
+        try:
+            with locked_file(PROJECTS_FILE):
+                if file_version(PROJECTS_FILE) != self.projects_version:
+                    raise ConcurrentModificationError(f"{PROJECTS_FILE} was changed by another program.")
+                atomic_write_rows(PROJECTS_FILE, [[p_item] for p_item in self.projects])
+                self.projects_version = file_version(PROJECTS_FILE)
+        except ConcurrentModificationError as e:
+            self.handle_concurrent_modification(e)
+            return False
+        return True
+
+    def rename_project(self, old_name, new_name):
+        """Rename a project in the log, the tasks, the achievements and projects.csv.
+
+        If ``new_name`` already exists the two projects are merged; a task that
+        exists in both keeps the row of ``new_name``. Each store is rewritten once.
+        """
+        updates = self.log_store.project_rename_updates(old_name, new_name)
+        if updates and not self.apply_log_batch(updates=updates):
+            return False
+        try:
+            with locked_file(LOG_FILE):
+                if self.log_store.rename_archived_project(old_name, new_name):
+                    self.log_store.reload()
+                    self.reload_log_views()
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not rename the project in the archive: {e}", parent=self.root)
+            return False
+
+        repair_task_layout()
+        with locked_file(METADATA_FILE):
+            with open(METADATA_FILE, 'r', newline='') as file:
+                rows = list(csv.reader(file))
+            merged_ids = {}
+            existing_tasks = {row[META_TASK]: row[META_ID] for row in rows[1:] if row[META_PROJECT] == new_name}
+            kept = rows[:1]
+            for row in rows[1:]:
+                if row[META_PROJECT] == old_name:
+                    if row[META_TASK] in existing_tasks:
+                        merged_ids[row[META_ID]] = existing_tasks[row[META_TASK]]
+                        continue
+                    row[META_PROJECT] = new_name
+                kept.append(row)
+            atomic_write_rows(METADATA_FILE, kept)
+
+        if any(project == old_name for project, _ in self.task_links):
+            self.task_links = {(new_name if project == old_name else project, description): merged_ids.get(task_id, task_id)
+                               for (project, description), task_id in self.task_links.items()}
+            save_task_links(self.task_links)
+
+        linked_achievements = self.achievements_by_project.get(old_name, [])
+        # Achievements of a task merged into its namesake follow it to the kept task ID.
+        relinked_achievements = [ach for game in self.games_data["games"] for ach in game["achievements"]
+                                 if ach["linked_task"] in merged_ids]
+        if linked_achievements or relinked_achievements:
+            for ach in linked_achievements:
+                ach["linked_to"] = new_name
+            for ach in relinked_achievements:
+                ach["linked_task"] = merged_ids[ach["linked_task"]]
+            if not self.save_games_data():
+                return False
+
+        if new_name in self.projects:
+            self.projects = [p for p in self.projects if p != old_name]
+        else:
+            self.projects = [new_name if p == old_name else p for p in self.projects]
+        if not self.save_projects():
+            return False
+        self.project_combo['values'] = self.projects
+        self.search_project_combo['values'] = ["All"] + self.projects
+        self.meta_entries["Project"]['values'] = self.projects
+        if self.project_var.get() == old_name:
+            self.project_var.set(new_name)
+        self.load_task_metadata()
+        self.schedule_refresh("achievements")
+        self.events.publish("project-renamed", old_name=old_name, new_name=new_name)
+        return True
+
+    def handle_concurrent_modification(self, error):
+        """Drop our stale in-memory state after a failed version check and ask the user to retry."""
+        self.load_projects()
+        self.project_combo['values'] = self.projects
+        self.search_project_combo['values'] = ["All"] + self.projects
+        # A full reload: the change may be an in-place edit that syncing alone would not notice.
+        self.log_store.reload()
+        self.reload_log_views()
+        self.load_task_metadata()
+        self.load_games_data()
+        self.schedule_refresh("achievements")
+        messagebox.showwarning("File Changed", f"{error}\n\nThe view has been reloaded, please try again.", parent=self.root)
 
     def manage_projects_window(self):
         win = tk.Toplevel(self.root)
         win.title("Manage Projects")
         win.transient(self.root)
         win.grab_set()
-        win.geometry("300x300")
+        win.geometry("360x440")
 
         list_frame = ttk.Frame(win)
         list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -622,8 +3996,22 @@ class WorkLoggerApp:
         project_listbox.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-        for p in self.projects:
-            project_listbox.insert(tk.END, p)
+        def refresh_listbox():
+            project_listbox.delete(0, tk.END)
+            for p in self.projects:
+                project_listbox.insert(tk.END, p)
+
+        refresh_listbox()
+
+        info_label = ttk.Label(win, text="Select a project to see its usage.", justify=tk.LEFT)
+        info_label.pack(fill=tk.X, padx=5)
+
+        def show_project_info(event=None):
+            selected_indices = project_listbox.curselection()
+            if selected_indices:
+                info_label.config(text=self.describe_project(project_listbox.get(selected_indices[0])))
+
+        project_listbox.bind("<<ListboxSelect>>", show_project_info)
 
         entry_frame = ttk.Frame(win)
         entry_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -644,6 +4032,7 @@ class WorkLoggerApp:
                     project_listbox.insert(tk.END, item)
 
                 self.project_combo['values'] = self.projects
+                self.search_project_combo['values'] = ["All"] + self.projects
                 if self.projects:
                     try:
                         self.project_combo.current(self.projects.index(self.project_var.get()))
@@ -651,10 +4040,9 @@ class WorkLoggerApp:
                          self.project_combo.current(0)
 
 
-                with open(PROJECTS_FILE, mode='w', newline='') as file:
-                    writer = csv.writer(file)
-                    for p_item in self.projects:
-                        writer.writerow([p_item])
+                if not self.save_projects():
+                    refresh_listbox()
+                    return
                 new_proj_entry.delete(0, tk.END)
             elif not new_proj:
                 messagebox.showwarning("Input Error", "Project name cannot be empty.", parent=win)
@@ -669,225 +4057,190 @@ class WorkLoggerApp:
             if selected_indices:
                 proj_to_remove = project_listbox.get(selected_indices[0])
 
-                if messagebox.askyesno("Confirm Delete", f"Are you sure you want to remove project '{proj_to_remove}'?", parent=win):
+                if messagebox.askyesno("Confirm Delete", f"Are you sure you want to remove project '{proj_to_remove}'?\n\n"
+                                       f"It is still referenced by:\n{self.describe_project(proj_to_remove)}", parent=win):
                     self.projects.remove(proj_to_remove)
                     project_listbox.delete(selected_indices[0])
                     self.project_combo['values'] = self.projects
+                    self.search_project_combo['values'] = ["All"] + self.projects
                     if self.projects:
                          self.project_combo.current(0)
                     else:
                         self.project_combo.set('')
 
-                    with open(PROJECTS_FILE, mode='w', newline='') as file:
-                        writer = csv.writer(file)
-                        for p_item in self.projects:
-                            writer.writerow([p_item])
+                    if not self.save_projects():
+                        refresh_listbox()
             else:
                 messagebox.showwarning("No Selection", "Please select a project to remove.", parent=win)
 
-        ttk.Button(win, text="Remove Selected", command=remove_selected_action).pack(pady=5)
-        ttk.Button(win, text="Close", command=win.destroy).pack(pady=5)
-
-
-    def show_statistics(self):
-        import matplotlib.dates as mdates
-
-        project_hours_total = defaultdict(float)
-        weekly_hours = defaultdict(lambda: defaultdict(float))
-        cumulative_per_project = defaultdict(list)
-        all_entries = []
-
-        if not os.path.exists(LOG_FILE):
-            messagebox.showinfo("No Data", "Log file is empty or does not exist.")
-            return
-
-        with open(LOG_FILE, mode='r', newline='') as file:
-            reader = csv.reader(file)
-            try:
-                next(reader)
-                for row in reader:
-                    if len(row) < 4: continue
-                    try:
-                        date_obj = datetime.strptime(row[0], "%Y-%m-%d %H:%M")
-                        project = row[1]
-                        hours = float(row[3])
-                        all_entries.append((date_obj, project, hours))
-                    except ValueError:
-                        continue
-            except StopIteration:
-                messagebox.showinfo("No Data", "No data logged yet.")
+        def rename_selected_action():
+            selected_indices = project_listbox.curselection()
+            if not selected_indices:
+                messagebox.showwarning("No Selection", "Please select a project to rename.", parent=win)
                 return
+            old_name = project_listbox.get(selected_indices[0])
+            new_name = simpledialog.askstring("Rename Project", f"New name for '{old_name}' (an existing name merges the two):",
+                                              initialvalue=old_name, parent=win)
+            if new_name is None:
+                return
+            new_name = new_name.strip()
+            if not new_name or new_name == old_name:
+                return
+            if new_name in self.projects and not messagebox.askyesno(
+                    "Merge Projects", f"'{new_name}' already exists. Merge '{old_name}' into it?", parent=win):
+                return
+            self.rename_project(old_name, new_name)
+            refresh_listbox()
+            info_label.config(text=self.describe_project(new_name))
 
-        if not all_entries:
-            messagebox.showinfo("No Data", "No valid data found in logs for statistics.")
-            return
-
-        all_entries.sort(key=lambda x: x[0])
-
-        current_cumulative_totals = defaultdict(float)
-        for date_obj, project, hours in all_entries:
-            project_hours_total[project] += hours
+        ttk.Button(win, text="Rename / Merge Selected", command=rename_selected_action).pack(pady=5)
+        ttk.Button(win, text="Remove Selected", command=remove_selected_action).pack(pady=5)
+        ttk.Button(win, text="Close", command=win.destroy).pack(pady=5)
 
-            year, week_num, _ = date_obj.isocalendar()
-            week_str = f"{year}-W{week_num:02d}"
-            weekly_hours[week_str][project] += hours
 
-            current_cumulative_totals[project] += hours
-            cumulative_per_project[project].append((date_obj, current_cumulative_totals[project]))
-
-        if project_hours_total:
-            plt.figure(figsize=(10, 6))
-            projects_sorted_names = sorted(project_hours_total.keys())
-            total_hrs_sorted = [project_hours_total[name] for name in projects_sorted_names]
-
-            plt.bar(projects_sorted_names, total_hrs_sorted, color='skyblue')
-            plt.title("Total Hours per Project")
-            plt.xlabel("Project")
-            plt.ylabel("Total Hours")
-            plt.xticks(rotation=45, ha="right")
-            plt.tight_layout()
-        else:
-            print("No data for total hours per project plot.")
-
-        if weekly_hours:
-            plt.figure(figsize=(12, 7))
-            sorted_weeks = sorted(weekly_hours.keys())
-            all_projects_in_log = sorted(list(set(proj for week_data in weekly_hours.values() for proj in week_data)))
-
-            bottom_values = [0] * len(sorted_weeks)
-
-            for project_name in all_projects_in_log:
-                project_weekly_hours = [weekly_hours[week].get(project_name, 0) for week in sorted_weeks]
-                plt.bar(sorted_weeks, project_weekly_hours, bottom=bottom_values, label=project_name)
-                bottom_values = [b + h for b, h in zip(bottom_values, project_weekly_hours)]
-
-            plt.title("Weekly Hours per Project (Stacked)")
-            plt.xlabel("Week (YYYY-Www)")
-            plt.ylabel("Hours")
-            plt.xticks(rotation=70, ha="right")
-            plt.legend(title="Projects", bbox_to_anchor=(1.05, 1), loc='upper left')
-            plt.tight_layout()
-            plt.subplots_adjust(right=0.85)
+    def render_statistics_chart(self, kind):
+        """PNG bytes of one statistics chart, drawn from the rollup tables; empty if it has no data."""
+        store = self.log_store
+        if kind == "totals":
+            figure = figure_project_totals({project: rollup["hours"] for project, rollup in store.project_rollups.items()})
+        elif kind == "weekly":
+            figure = figure_weekly_hours(store.bucket_hours("week"))
         else:
-            print("No data for weekly hours plot.")
-
-        if cumulative_per_project:
-            plt.figure(figsize=(12, 7))
-            projects_cumulative_sorted_names = sorted(cumulative_per_project.keys())
-            for project_name in projects_cumulative_sorted_names:
-                data_points = cumulative_per_project[project_name]
-                if data_points:
-                    dates = [dp[0] for dp in data_points]
-                    cum_hours = [dp[1] for dp in data_points]
-                    plt.plot(dates, cum_hours, marker='o', linestyle='-', label=project_name)
-
-            plt.title("Cumulative Work Hours Over Time by Project")
-            plt.xlabel("Date")
-            plt.ylabel("Cumulative Hours")
-            plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-            plt.gcf().autofmt_xdate(rotation=45)
-            plt.legend(title="Projects")
-            plt.grid(True, linestyle='--', alpha=0.7)
-            plt.tight_layout()
-        else:
-            print("No data for cumulative hours plot.")
+            figure = figure_cumulative_hours(store.bucket_hours("day"))
+        return figure_png(figure) if figure is not None else b""
+
+    def statistics_charts(self):
+        """(kind, PNG bytes) per chart with data; charts are re-rendered only after the log changed."""
+        store = self.log_store
+        charts = []
+        for kind in STATISTICS_CHARTS:
+            png = self.chart_cache.get((store.content_key(), kind),
+                                       lambda kind=kind: self.render_statistics_chart(kind))
+            if png:
+                charts.append((kind, png))
+        return charts
 
-        if not project_hours_total and not weekly_hours and not cumulative_per_project:
-            messagebox.showinfo("No Data", "Not enough data to generate any statistics plots.")
+    def show_statistics(self):
+        charts = self.statistics_charts()
+        if not charts:
+            messagebox.showinfo("No Data", "No valid data found in logs for statistics.")
             return
 
-        plt.show()
-
+        win = tk.Toplevel(self.root)
+        win.title("Statistics")
+        notebook = ttk.Notebook(win)
+        notebook.pack(expand=True, fill="both")
+        titles = {"totals": "Total Hours", "weekly": "Weekly Hours", "cumulative": "Cumulative Hours"}
+        for kind, png in charts:
+            image = tk.PhotoImage(master=win, data=base64.b64encode(png))
+            label = ttk.Label(notebook, image=image)
+            label.image = image # Keep a reference so Tk does not drop the image
+            notebook.add(label, text=titles[kind])
 
     def export_statistics_to_pdf(self):
-        stats = defaultdict(float)
-        if not os.path.exists(LOG_FILE):
-            messagebox.showinfo("No Data", "Log file is empty or does not exist.")
-            return
-
-        with open(LOG_FILE, mode='r', newline='') as file:
-            reader = csv.reader(file)
-            try:
-                next(reader)
-                for row in reader:
-                    if len(row) < 4: continue
-                    try:
-                        project = row[1]
-                        hours = float(row[3])
-                        stats[project] += hours
-                    except ValueError:
-                        continue
-            except StopIteration:
-                messagebox.showinfo("No Data", "No data logged yet to export.")
-                return
+        stats = {project: rollup["hours"] for project, rollup in self.log_store.project_rollups.items()}
 
         if not stats:
             messagebox.showinfo("No Data", "No valid data found in logs to export.")
             return
 
         filename = f"work_statistics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        c = canvas.Canvas(filename, pagesize=LETTER)
-        width, height = LETTER
-
-        c.setFont("Helvetica-Bold", 18)
-        c.drawCentredString(width / 2.0, height - 50, "Work Statistics Report")
-
-        c.setFont("Helvetica", 10)
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        c.drawString(50, height - 75, f"Report Generated: {current_time}")
-
-        y_position = height - 120
-        line_height = 20
-
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(60, y_position, "Project")
-        c.drawString(300, y_position, "Total Hours")
-        y_position -= (line_height * 0.5)
-        c.line(50, y_position, width - 50, y_position)
-        y_position -= (line_height * 0.75)
-
-
-        c.setFont("Helvetica", 11)
-        total_overall_hours = 0
-        for project, hours in sorted(stats.items()):
-            if y_position < 60:
-                c.showPage()
-                c.setFont("Helvetica-Bold", 12)
-                c.drawString(60, height - 50, "Project (Continued)")
-                c.drawString(300, height-50, "Total Hours (Continued)")
-                y_position = height - 80
-                c.setFont("Helvetica", 11)
-
-
-            c.drawString(60, y_position, project)
-            c.drawString(300, y_position, f"{hours:.2f} hours")
-            total_overall_hours += hours
-            y_position -= line_height
-
-        y_position -= (line_height * 0.5)
-        c.line(50, y_position, width - 50, y_position)
-        y_position -= (line_height * 0.75)
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(60, y_position, "Overall Total")
-        c.drawString(300, y_position, f"{total_overall_hours:.2f} hours")
-
-        c.save()
+        write_statistics_pdf(filename, stats, [png for _, png in self.statistics_charts()])
         messagebox.showinfo("Export Successful", f"Statistics report exported to {filename}")
 
+    def batch_reports_window(self):
+        """Write per-project and per-month PDFs in worker processes, polling them from the Tk loop."""
+        out_dir = filedialog.askdirectory(parent=self.root, title="Folder for Batch Reports")
+        if not out_dir:
+            return
+        try:
+            column_path, jobs = prepare_batch_reports(self.log_store, out_dir)
+        except OSError as e:
+            messagebox.showerror("Report Error", str(e), parent=self.root)
+            return
+        if not jobs:
+            os.remove(column_path)
+            messagebox.showinfo("No Data", "No valid data found in logs to export.")
+            return
+
+        pool = ProcessPoolExecutor()
+        futures = [pool.submit(write_batch_report, *job) for job in jobs]
+        win = tk.Toplevel(self.root)
+        win.title("Batch Reports")
+        status_label = ttk.Label(win, text="")
+        status_label.pack(padx=20, pady=20)
+
+        def poll():
+            # Scheduled on the root so closing the progress window does not orphan the pool.
+            done = sum(future.done() for future in futures)
+            if win.winfo_exists():
+                status_label.config(text=f"Written {done} of {len(futures)} reports...")
+            if done < len(futures):
+                self.root.after(200, poll)
+                return
+            pool.shutdown()
+            os.remove(column_path)
+            errors = [future.exception() for future in futures if future.exception() is not None]
+            if win.winfo_exists():
+                win.destroy()
+            if errors:
+                messagebox.showerror("Report Error", f"{len(errors)} reports failed:\n{errors[0]}", parent=self.root)
+            else:
+                messagebox.showinfo("Export Successful", f"Wrote {len(futures)} reports to {out_dir}", parent=self.root)
+        poll()
+
     # --- Achievement System Methods ---
     def load_games_data(self):
         try:
-            with open(GAMES_FILE, 'r') as f:
-                self.games_data = json.load(f)
-                if "games" not in self.games_data:
-                    self.games_data["games"] = []
+            with locked_file(GAMES_FILE, shared=True):
+                self.games_version = file_version(GAMES_FILE)
+                with open(GAMES_FILE, 'r') as f:
+                    self.games_data = json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
             self.games_data = {"games": []}
             self.save_games_data()
+        self.index_achievements()
+
+    def index_achievements(self):
+        """Map each linked project to its achievement dicts and compile the automatic rules."""
+        self.achievements_by_project = defaultdict(list)
+        # Compiled automatic rules by linked project; None holds the rules counting every project
+        self.achievement_rules = defaultdict(list)
+        # Manual achievements completed by a task: linked by task ID or named like the task
+        self.manual_achievements_by_task = defaultdict(list)
+        self.manual_achievements_by_name = defaultdict(list)
+        # Every achievement carries the ACHIEVEMENT_DEFAULTS keys (see migrate_games).
+        for game in self.games_data["games"]:
+            for ach in game["achievements"]:
+                if ach["linked_to"]:
+                    self.achievements_by_project[ach["linked_to"]].append(ach)
+                if ach["type"] == "manual":
+                    if ach["linked_task"]:
+                        self.manual_achievements_by_task[ach["linked_task"]].append((game["name"], ach))
+                    else:
+                        self.manual_achievements_by_name[ach["name"].strip().lower()].append((game["name"], ach))
+                evaluate = compile_achievement_rule(ach)
+                if evaluate is not None:
+                    self.achievement_rules[ach["linked_to"] or None].append((game["name"], ach, evaluate))
+
+    def refresh_games_data(self):
+        """Reload games.json only if another program changed it since it was read or written."""
+        if file_version(GAMES_FILE) != self.games_version:
+            self.load_games_data()
 
     def save_games_data(self):
-        with open(GAMES_FILE, 'w') as f:
-            json.dump(self.games_data, f, indent=4)
+        """Persist games_data; returns False if games.json changed on disk since it was loaded."""
+        try:
+            with locked_file(GAMES_FILE):
+                if file_version(GAMES_FILE) != self.games_version:
+                    raise ConcurrentModificationError(f"{GAMES_FILE} was changed by another program.")
+                atomic_write(GAMES_FILE, lambda f: json.dump(self.games_data, f, indent=4))
+                self.games_version = file_version(GAMES_FILE)
+            self.index_achievements()
+        except ConcurrentModificationError as e:
+            self.handle_concurrent_modification(e)
+            return False
+        return True
 
     def build_achievements_tab(self):
         tab = self.tab_achievements
@@ -1002,6 +4355,8 @@ class WorkLoggerApp:
                     locked_ach += 1
                 
                 target_display = ach.get("target", "") if ach.get("target") is not None else ""
+                if ach.get("type") == "window_hours" and target_display != "":
+                    target_display = f"{target_display} in {ach.get('window', DEFAULT_ACHIEVEMENT_WINDOW)} days"
                 self.achievements_tree.insert("", tk.END, values=(
                     ach.get("name", ""),
                     ach.get("description", ""),
@@ -1030,7 +4385,8 @@ class WorkLoggerApp:
                 messagebox.showwarning("Duplicate", f"A game named '{game_name}' already exists.", parent=self.root)
                 return
             self.games_data.setdefault("games", []).append({"name": game_name, "achievements": []})
-            self.save_games_data()
+            if not self.save_games_data():
+                return
             self.update_game_combo_values()
             messagebox.showinfo("Success", f"Game '{game_name}' added.", parent=self.root)
 
@@ -1056,7 +4412,8 @@ class WorkLoggerApp:
                 if game["name"] == selected_game_name:
                     game["name"] = new_game_name
                     break
-            self.save_games_data()
+            if not self.save_games_data():
+                return
             self.update_game_combo_values()
             messagebox.showinfo("Success", f"Game '{selected_game_name}' updated to '{new_game_name}'.", parent=self.root)
 
@@ -1069,7 +4426,8 @@ class WorkLoggerApp:
 
         if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete the game '{selected_game_name}' and all its achievements?", parent=self.root):
             self.games_data["games"] = [g for g in self.games_data.get("games", []) if g["name"] != selected_game_name]
-            self.save_games_data()
+            if not self.save_games_data():
+                return
             self.update_game_combo_values()
             messagebox.showinfo("Deleted", f"Game '{selected_game_name}' deleted.", parent=self.root)
 
@@ -1110,11 +4468,19 @@ class WorkLoggerApp:
         dialog.grab_set()
         dialog.resizable(False, False)
 
+        # Manual achievements can be completed by a task; the combobox shows "Project: Task".
+        task_labels = {task_id: f"{project}: {task}" for task_id, (project, task) in self.task_names_by_id.items()}
+        task_ids_by_label = {label: task_id for task_id, label in task_labels.items()}
+        if initial_data and initial_data.get("linked_task"):
+            initial_data = dict(initial_data, linked_task=task_labels.get(initial_data["linked_task"]))
+
         fields_setup = [
             {"label": "Name", "key": "name", "widget": "entry"},
             {"label": "Description", "key": "description", "widget": "entry"},
-            {"label": "Type", "key": "type", "widget": "combobox", "values": ["counter", "streak", "manual"]},
+            {"label": "Type", "key": "type", "widget": "combobox", "values": ACHIEVEMENT_TYPES},
             {"label": "Target", "key": "target", "widget": "entry"},
+            {"label": "Window (days)", "key": "window", "widget": "entry"},
+            {"label": "Linked Task", "key": "linked_task", "widget": "combobox", "values": ["None"] + sorted(task_ids_by_label)},
             {"label": "Linked Project", "key": "linked_to", "widget": "combobox", "values": ["None"] + self.projects}
         ]
         entries_vars = {}
@@ -1152,23 +4518,35 @@ class WorkLoggerApp:
             ach_type = ach_data.get("type")
             target_str = ach_data.get("target", "")
 
-            if ach_type in ["counter", "streak"]:
+            if ach_type in ACHIEVEMENT_MEASURES:
                 if not target_str:
-                    messagebox.showerror("Input Error", f"Target is required and must be a positive integer for '{ach_type}' achievements.", parent=dialog)
+                    messagebox.showerror("Input Error", f"Target is required and must be a positive number for '{ach_type}' achievements.", parent=dialog)
                     return
                 try:
-                    ach_data["target"] = int(target_str)
-                    if ach_data["target"] <= 0 and ach_type in ["counter", "streak"]:
-                         messagebox.showerror("Input Error", "Target must be a positive integer for counter/streak.", parent=dialog)
+                    target = float(target_str)
+                    ach_data["target"] = int(target) if target.is_integer() else target
+                    if ach_data["target"] <= 0:
+                         messagebox.showerror("Input Error", "Target must be a positive number.", parent=dialog)
                          return
                 except ValueError:
-                    messagebox.showerror("Input Error", "Target must be a valid integer for counter/streak.", parent=dialog)
+                    messagebox.showerror("Input Error", "Target must be a valid number.", parent=dialog)
                     return
             else:
                 ach_data["target"] = None
 
+            window_str = ach_data.pop("window", "")
+            if ach_type == "window_hours":
+                try:
+                    ach_data["window"] = int(window_str) if window_str else DEFAULT_ACHIEVEMENT_WINDOW
+                    if ach_data["window"] <= 0:
+                        raise ValueError
+                except ValueError:
+                    messagebox.showerror("Input Error", "Window must be a positive number of days.", parent=dialog)
+                    return
+
             if ach_data.get("linked_to") == "None":
                 ach_data["linked_to"] = None
+            ach_data["linked_task"] = task_ids_by_label.get(ach_data.get("linked_task")) if ach_type == "manual" else None
             
             current_game_obj = next((g for g in self.games_data.get("games", []) if g["name"] == game_name), None)
             if not current_game_obj:
@@ -1189,10 +4567,12 @@ class WorkLoggerApp:
                 current_game_obj["achievements"][achievement_index].update(ach_data)
             else:
                 ach_data["unlocked"] = False
-                current_game_obj.setdefault("achievements", []).append(ach_data)
+                current_game_obj["achievements"].append(dict(ACHIEVEMENT_DEFAULTS, **ach_data))
 
-            self.save_games_data()
-            self.on_game_selected()
+            if not self.save_games_data():
+                dialog.destroy()
+                return
+            self.schedule_refresh("achievements")
             dialog.destroy()
             messagebox.showinfo("Success", "Achievement saved.", parent=self.root)
 
@@ -1221,8 +4601,9 @@ class WorkLoggerApp:
                 if game["name"] == selected_game_name:
                     game["achievements"] = [ach for ach in game.get("achievements", []) if ach.get("name") != ach_name_to_delete]
                     break
-            self.save_games_data()
-            self.on_game_selected()
+            if not self.save_games_data():
+                return
+            self.schedule_refresh("achievements")
             messagebox.showinfo("Deleted", f"Achievement '{ach_name_to_delete}' deleted.", parent=self.root)
 
 
@@ -1260,123 +4641,452 @@ class WorkLoggerApp:
                     return
 
         ach_obj["unlocked"] = new_status
-        self.save_games_data()
-        self.on_game_selected()
+        if not self.save_games_data():
+            return
+        self.schedule_refresh("achievements")
         messagebox.showinfo("Status Changed", f"Achievement '{ach_name_to_toggle}' is now {verb}.", parent=self.root)
 
-    def check_achievements_on_log(self, logged_project_name, logged_date_str):
-        self.load_games_data()
-        try:
-            logged_date_obj = datetime.strptime(logged_date_str, "%Y-%m-%d %H:%M").date()
-        except ValueError:
-            print(f"Error: Invalid date format in log entry: {logged_date_str}")
+    # --- Event subscribers ---
+    def queue_achievement_check(self, row_ids):
+        entries = self.log_store.entries
+        self.pending_achievement_entries.extend((entries[row_id][1], entries[row_id][0]) for row_id in row_ids)
+        self.schedule_refresh("achievement_check")
+
+    def queue_forecast(self, row_ids):
+        entries = self.log_store.entries
+        self.mark_forecast_dirty({entries[row_id][1] for row_id in row_ids})
+
+    def on_task_completed(self, project, task, task_id):
+        """Unlock manual achievements matching the task and check the project's rules."""
+        # Completed-task rules are checked like a log entry for the project, dated now.
+        self.pending_achievement_entries.append((project, datetime.now().strftime(LOG_DATE_FORMAT)))
+        self.schedule_refresh("achievement_check")
+
+        # The in-memory index is current; save_games_data refuses if games.json changed meanwhile.
+        matches = list(self.manual_achievements_by_task.get(task_id, [])) if task_id else []
+        matches += [(game_name, ach) for game_name, ach in self.manual_achievements_by_name.get(task.strip().lower(), [])
+                    if ach.get("linked_to") in (None, "", project)]
+        unlocked = []
+        for game_name, ach in matches:
+            if not ach.get("unlocked"):
+                ach["unlocked"] = True
+                unlocked.append(f"{game_name} - {ach['name']}")
+        if not unlocked or not self.save_games_data():
             return
+        self.schedule_refresh("achievements")
+        messagebox.showinfo("Achievements Unlocked!", "New Achievements Unlocked!\n\n" + "\n".join(unlocked), parent=self.root)
+
+    def on_project_renamed(self, old_name, new_name):
+        if self.log_filters and self.log_filters.get("project") == old_name:
+            self.log_filters["project"] = new_name
+            self.search_project_var.set(new_name)
+            self.schedule_refresh("log")
+        if self.heatmap_project_var.get() == old_name:
+            self.heatmap_project_var.set(new_name)
+            self.schedule_refresh("heatmap")
+
+    # --- Heatmap: hours per day as a calendar of canvas cells ---
+    def build_heatmap_tab(self):
+        tab = self.tab_heatmap
+        tab.columnconfigure(0, weight=1)
+        tab.rowconfigure(1, weight=1)
 
-        work_log_entries = self.get_all_work_logs()
-
-        unlocked_achievements_info = []
-        game_changed = False
-
-        for game in self.games_data.get("games", []):
-            for ach in game.get("achievements", []):
-                if ach.get("unlocked"):
-                    continue
-
-                linked_project_for_ach = ach.get("linked_to")
-                ach_type = ach.get("type")
-                target = ach.get("target")
-
-                is_relevant_project_for_ach = (linked_project_for_ach is None or linked_project_for_ach == "" or linked_project_for_ach == logged_project_name)
-
-
-                if ach_type == "counter" and target is not None:
-                    if linked_project_for_ach is None or linked_project_for_ach == "":
-                        total_hours = 0
-                        for _, _, _, entry_hours_str in work_log_entries:
-                            try: total_hours += float(entry_hours_str)
-                            except ValueError: continue
-                    elif linked_project_for_ach == logged_project_name:
-                        total_hours = 0
-                        for _, entry_project, _, entry_hours_str in work_log_entries:
-                            if entry_project == linked_project_for_ach:
-                                try: total_hours += float(entry_hours_str)
-                                except ValueError: continue
-                    else:
-                        continue
-
-
-                    if total_hours >= target:
-                        ach["unlocked"] = True
-                        unlocked_achievements_info.append(f"{game['name']} - {ach['name']}")
-                        game_changed = True
+        controls = ttk.Frame(tab)
+        controls.grid(row=0, column=0, columnspan=2, sticky="ew", padx=10, pady=5)
+        ttk.Label(controls, text="Project:").pack(side=tk.LEFT)
+        self.heatmap_project_var = tk.StringVar(value="All")
+        heatmap_project_combo = ttk.Combobox(controls, textvariable=self.heatmap_project_var, state="readonly", width=25,
+                                             postcommand=lambda: heatmap_project_combo.configure(values=["All"] + self.projects))
+        heatmap_project_combo.pack(side=tk.LEFT, padx=5)
+        heatmap_project_combo.bind("<<ComboboxSelected>>", lambda event: self.update_heatmap())
+        self.heatmap_info = ttk.Label(controls, text="")
+        self.heatmap_info.pack(side=tk.LEFT, padx=20)
+
+        self.heatmap_canvas = tk.Canvas(tab, background="white", highlightthickness=0)
+        scrollbar = ttk.Scrollbar(tab, orient=tk.VERTICAL, command=self.heatmap_canvas.yview)
+        self.heatmap_canvas.configure(yscrollcommand=scrollbar.set)
+        self.heatmap_canvas.grid(row=1, column=0, sticky="nsew", padx=(10, 0), pady=(0, 10))
+        scrollbar.grid(row=1, column=1, sticky="ns", pady=(0, 10))
+        self.heatmap_canvas.bind("<Motion>", self.on_heatmap_motion)
+
+        self.heatmap_years = None
+        self.update_heatmap()
+
+    def layout_heatmap(self, first_year, last_year):
+        """Create one rectangle per day of the years shown, newest year on top.
+
+        Only called when the range of years changes; everything else just
+        recolors the existing cells.
+        """
+        canvas = self.heatmap_canvas
+        canvas.delete("all")
+        self.heatmap_cells = {} # day -> canvas item
+        self.heatmap_days = {} # canvas item -> day
+        self.heatmap_colors = {} # canvas item -> current fill
+        step = HEATMAP_CELL + HEATMAP_GAP
+        top = HEATMAP_GAP
+        for year in range(last_year, first_year - 1, -1):
+            first_day = datetime(year, 1, 1).date()
+            origin = first_day - timedelta(days=first_day.weekday())
+            canvas.create_text(HEATMAP_MARGIN - 8, top + 12 + 3.5 * step, text=str(year), anchor="e")
+            day = first_day
+            while day.year == year:
+                x = HEATMAP_MARGIN + (day - origin).days // 7 * step
+                if day.day == 1:
+                    canvas.create_text(x, top, text=day.strftime("%b"), anchor="nw", font=("TkDefaultFont", 8))
+                y = top + 12 + day.weekday() * step
+                item = canvas.create_rectangle(x, y, x + HEATMAP_CELL, y + HEATMAP_CELL,
+                                               fill=HEATMAP_COLORS[0], outline="")
+                self.heatmap_cells[day] = item
+                self.heatmap_days[item] = day
+                self.heatmap_colors[item] = HEATMAP_COLORS[0]
+                day += timedelta(days=1)
+            top += 12 + 7 * step + 2 * HEATMAP_CELL
+        canvas.configure(scrollregion=canvas.bbox("all"))
+        self.heatmap_years = (first_year, last_year)
+
+    def heatmap_hours(self, day, project):
+        """Hours logged on ``day`` for ``project`` ("All" for every project), from the per-day rollups."""
+        if project == "All":
+            return self.log_store.per_day.get(day, 0.0)
+        bucket = self.log_store.buckets["day"].get(day, {}).get(project)
+        return bucket[0] if bucket else 0.0
+
+    def update_heatmap(self):
+        """Recolor the cells whose day moved to another level; unchanged cells are not touched."""
+        today = datetime.now().date()
+        years = [year for year, hours in self.log_store.per_year.items() if hours > 1e-9] + [today.year]
+        if (min(years), max(years)) != self.heatmap_years:
+            self.layout_heatmap(min(years), max(years))
+        project = self.heatmap_project_var.get()
+        canvas = self.heatmap_canvas
+        colors = self.heatmap_colors
+        for day, item in self.heatmap_cells.items():
+            hours = self.heatmap_hours(day, project)
+            color = HEATMAP_COLORS[1 + bisect.bisect_right(HEATMAP_LEVELS, hours) if hours > 0 else 0]
+            if colors[item] != color:
+                canvas.itemconfigure(item, fill=color)
+                colors[item] = color
+
+    def on_heatmap_motion(self, event):
+        items = self.heatmap_canvas.find_withtag("current")
+        day = self.heatmap_days.get(items[0]) if items else None
+        if day is None:
+            self.heatmap_info.config(text="")
+            return
+        hours = self.heatmap_hours(day, self.heatmap_project_var.get())
+        self.heatmap_info.config(text=f"{day:%a %Y-%m-%d}: {hours:.1f} h")
 
-                elif ach_type == "streak" and target is not None:
-                    relevant_work_dates = set()
-                    for entry_date_str_from_log, entry_project, _, _ in work_log_entries:
-                        try:
-                            d = datetime.strptime(entry_date_str_from_log, "%Y-%m-%d %H:%M").date()
-                            if linked_project_for_ach is None or linked_project_for_ach == "" or entry_project == linked_project_for_ach:
-                                relevant_work_dates.add(d)
-                        except ValueError:
-                            continue
+    # --- Forecast: projected completion of open tasks from each project's velocity ---
+    def build_forecast_tab(self):
+        tab = self.tab_forecast
+        tab.columnconfigure(0, weight=1)
+        tab.rowconfigure(1, weight=1)
 
-                    if not relevant_work_dates or logged_date_obj not in relevant_work_dates:
-                        continue
+        self.forecast_info = ttk.Label(tab, text="")
+        self.forecast_info.grid(row=0, column=0, columnspan=2, sticky="w", padx=10, pady=5)
 
-                    sorted_dates = sorted(list(relevant_work_dates), reverse=True)
+        cols = ("Project", "Task", "Deadline", "Estimate", "Logged", "Remaining", "Velocity", "Projected", "Status")
+        self.forecast_tree = ttk.Treeview(tab, columns=cols, show="headings")
+        for col in cols:
+            self.forecast_tree.heading(col, text=col)
+            self.forecast_tree.column(col, width=90, anchor="center")
+        self.forecast_tree.column("Project", width=130, anchor="w")
+        self.forecast_tree.column("Task", width=220, anchor="w")
+        self.forecast_tree.grid(row=1, column=0, sticky="nsew", padx=(10, 0), pady=(0, 10))
+        scrollbar = ttk.Scrollbar(tab, orient=tk.VERTICAL, command=self.forecast_tree.yview)
+        self.forecast_tree.configure(yscroll=scrollbar.set)
+        scrollbar.grid(row=1, column=1, sticky="ns", pady=(0, 10))
+
+        self.forecast_tree.tag_configure("Overdue", foreground="darkred")
+        self.forecast_tree.tag_configure("At risk", foreground="red")
+        self.forecast_tree.tag_configure("On track", foreground="darkgreen")
+        self.forecast_statuses = {} # task_id -> status shown
+
+    def mark_forecast_dirty(self, projects=None):
+        """Queue a forecast update for ``projects`` (all projects when None)."""
+        if projects is None or self.dirty_forecast_projects is None:
+            self.dirty_forecast_projects = None
+        else:
+            self.dirty_forecast_projects.update(projects)
+        self.schedule_refresh("forecast")
+
+    def update_forecast(self):
+        """Recompute velocity and projections for the dirty projects only and update their rows in place.
+
+        Everything is recomputed when all projects are dirty or the date has
+        changed, since every velocity window then moves.
+        """
+        today = datetime.now().date()
+        projects, self.dirty_forecast_projects = self.dirty_forecast_projects, set()
+        if projects is None or today != self.forecast_day:
+            projects = None
+            self.forecast_day = today
+            self.velocities = {}
+        tasks = {task_id: task for task_id, task in self.forecast_inputs.items() if projects is None or task[0] in projects}
+        for project in {task[0] for task in tasks.values()}:
+            # Today's velocity and the one a window earlier, for the trend
+            series = velocity_series(self.log_store, project, today, VELOCITY_WINDOW + 1)
+            self.velocities[project] = (float(series[-1]), float(series[0]))
+        forecasts = forecast_tasks(tasks, {project: velocity for project, (velocity, _) in self.velocities.items()},
+                                   self.task_hours, today)
+
+        tree = self.forecast_tree
+        order = forecasts
+        if projects is None:
+            tree.delete(*tree.get_children())
+            self.forecast_statuses = {}
+            order = sorted(forecasts, key=lambda task_id: (
+                FORECAST_STATUS_ORDER.index(forecasts[task_id][2]), forecasts[task_id][1] or datetime.max.date(),
+                self.task_names_by_id[task_id]))
+        for task_id in order:
+            remaining, projected, status = forecasts[task_id]
+            project, deadline, estimate = tasks[task_id]
+            velocity, previous = self.velocities[project]
+            trend = "\u2191" if velocity > previous else "\u2193" if velocity < previous else ""
+            values = (project, self.task_names_by_id[task_id][1], deadline.strftime(DEADLINE_FORMAT) if deadline else "",
+                      f"{estimate:.1f}", f"{self.task_hours.get(task_id, 0.0):.1f}", f"{remaining:.1f}",
+                      f"{velocity:.2f} {trend}".rstrip(), projected.strftime(DEADLINE_FORMAT) if projected else "Unknown", status)
+            if tree.exists(task_id):
+                tree.item(task_id, values=values, tags=(status,))
+            else:
+                tree.insert("", tk.END, iid=task_id, values=values, tags=(status,))
+            self.forecast_statuses[task_id] = status
+
+        counts = defaultdict(int)
+        for status in self.forecast_statuses.values():
+            counts[status] += 1
+        self.forecast_info.config(text=f"{len(self.forecast_statuses)} open tasks with an estimate: "
+                                       f"{counts['Overdue']} overdue, {counts['At risk']} at risk. "
+                                       f"Velocity is hours per day over the last {VELOCITY_WINDOW} days; "
+                                       f"each project works its tasks earliest deadline first.")
+
+    def check_achievements_for_entries(self, logged_entries):
+        """Evaluate the locked achievements of the logged projects once for a batch of (project, date_str) entries."""
+        self.refresh_games_data()
+        logged = set()
+        for logged_project_name, logged_date_str in logged_entries:
+            try:
+                logged.add((logged_project_name, parse_log_date(logged_date_str).date()))
+            except ValueError:
+                print(f"Error: Invalid date format in log entry: {logged_date_str}")
+        if not logged:
+            return
+        days_by_project = defaultdict(set)
+        for project, day in logged:
+            days_by_project[project].add(day)
+        all_days = {day for _, day in logged}
 
-                    current_streak = 0
-                    try:
-                        start_index = sorted_dates.index(logged_date_obj)
-                    except ValueError:
-                        continue
+        unlocked_achievements_info = []
+        game_changed = False
 
-                    current_streak = 1
-                    expected_date = logged_date_obj - timedelta(days=1)
-
-                    for i in range(start_index + 1, len(sorted_dates)):
-                        if sorted_dates[i] == expected_date:
-                            current_streak += 1
-                            expected_date -= timedelta(days=1)
-                        elif sorted_dates[i] < expected_date:
-                            break
-                    
-                    if current_streak >= target:
-                        ach["unlocked"] = True
-                        unlocked_achievements_info.append(f"{game['name']} - {ach['name']}")
-                        game_changed = True
+        candidates = [(rule, all_days) for rule in self.achievement_rules.get(None, ())]
+        for project, days in days_by_project.items():
+            candidates.extend((rule, days) for rule in self.achievement_rules.get(project, ()))
+        for (game_name, ach, evaluate), days in candidates:
+            if ach.get("unlocked"):
+                continue
+            if any(evaluate(self.log_store, self.task_counts, day) for day in days):
+                ach["unlocked"] = True
+                unlocked_achievements_info.append(f"{game_name} - {ach['name']}")
+                game_changed = True
 
         if game_changed:
-            self.save_games_data()
-            if self.notebook.index(self.notebook.select()) == self.notebook.tabs().index(str(self.tab_achievements)):
-                 self.on_game_selected()
+            if not self.save_games_data():
+                return
+            self.schedule_refresh("achievements")
 
         if unlocked_achievements_info:
             summary_message = "New Achievements Unlocked!\n\n" + "\n".join(unlocked_achievements_info)
             messagebox.showinfo("Achievements Unlocked!", summary_message, parent=self.root)
 
-
-    def get_all_work_logs(self):
-        """Helper to read all entries from work_log.csv"""
-        entries = []
-        if not os.path.exists(LOG_FILE):
-            return entries
-        with open(LOG_FILE, mode='r', newline='') as file:
-            reader = csv.reader(file)
-            try:
-                next(reader)
-                for row in reader:
-                    if len(row) == 4:
-                        entries.append(row)
-            except StopIteration:
-                pass
-        return entries
-
-
-if __name__ == "__main__":
+    def on_close(self):
+        if self.timer is not None:
+            answer = messagebox.askyesnocancel(
+                "Timer Running", "A timer is still running. Log it before closing?\n\n"
+                "Yes: log it\nNo: discard it\nCancel: keep the planner open", parent=self.root)
+            if answer is None:
+                return
+            self.stop_timer(log=answer)
+        if self.log_watch_job is not None:
+            self.root.after_cancel(self.log_watch_job)
+        if self.api_job is not None:
+            self.root.after_cancel(self.api_job)
+            self.api_server.close()
+        if self.refresh_job is not None:
+            self.root.after_cancel(self.refresh_job)
+        try:
+            self.log_store.save_snapshot()
+        except OSError as e:
+            print(f"Warning: could not write snapshot: {e}")
+        self.chart_cache.spill_all()
+        self.root.destroy()
+
+
+def run_cli(argv):
+    """Headless entry points; the GUI starts when no command is given."""
+    parser = argparse.ArgumentParser(prog="Planner_GUI.py", description="Work planner command line tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Bulk import work logs from a CSV or JSON-lines file.")
+    import_parser.add_argument("source")
+    import_parser.add_argument("--map", action="append", default=[], metavar="FIELD=COLUMN",
+                               help="Source column for a log field (Date, Project, Task, Hours).")
+    import_parser.add_argument("--date-format", default=LOG_DATE_FORMAT)
+    import_parser.add_argument("--add-projects", action="store_true",
+                               help="Add unknown projects to projects.csv.")
+
+    stats_parser = commands.add_parser("stats", help="Chart a log file in one streaming pass.")
+    stats_parser.add_argument("log", nargs="?", default=LOG_FILE)
+    stats_parser.add_argument("--pdf", metavar="PATH", help="Write the PDF report instead of showing charts.")
+    stats_parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    reports_parser = commands.add_parser("reports", help="Write one PDF per project and per month in parallel.")
+    reports_parser.add_argument("out_dir")
+    reports_parser.add_argument("--log", default=LOG_FILE)
+    reports_parser.add_argument("--by", choices=["project", "month", "both"], default="both")
+    reports_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU).")
+
+    check_parser = commands.add_parser("check", help="Validate every data file in one streaming pass.")
+    check_parser.add_argument("--repair", action="store_true",
+                              help="Fix what can be fixed; removed log rows are kept in a rejected-rows file.")
+
+    archive_parser = commands.add_parser("archive", help="Move closed years of the log into compressed partitions.")
+    archive_parser.add_argument("--before", type=int, default=datetime.now().year, metavar="YEAR",
+                                help="Archive entries dated before this year (default: the current year).")
+
+    gui_parser = commands.add_parser("gui", help="Start the planner window (the default without a command).")
+    gui_parser.add_argument("--api", action="store_true", help=f"Also serve the local HTTP/JSON API on {API_HOST}.")
+    gui_parser.add_argument("--port", type=int, default=API_PORT)
+
+    serve_parser = commands.add_parser("serve", help=f"Serve the local HTTP/JSON API on {API_HOST} without a window.")
+    serve_parser.add_argument("--port", type=int, default=API_PORT)
+
+    args = parser.parse_args(argv)
+    if args.command == "gui":
+        run_gui(args.port if args.api else None)
+    elif args.command == "serve":
+        store = WorkLogStore()
+        store.load()
+        server = LocalApiServer(store, store.sync, port=args.port)
+        try:
+            server.start()
+        except OSError as e:
+            print(f"Could not listen on {API_HOST}:{args.port}: {e}", file=sys.stderr)
+            return 1
+        print(f"Serving on http://{API_HOST}:{server.port}/ (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            store.save_snapshot()
+    elif args.command == "check":
+        try:
+            report = check_data_files(repair=args.repair)
+        except OSError as e:
+            print(f"Could not check the data files: {e}", file=sys.stderr)
+            return 1
+        print("\n".join(report.lines()))
+        return 1 if report.counts and not args.repair else 0
+    elif args.command == "archive":
+        store = WorkLogStore()
+        store.load()
+        try:
+            with locked_file(LOG_FILE):
+                moved = store.archive_closed_years(args.before)
+        except (OSError, ConcurrentModificationError) as e:
+            print(f"Could not archive {LOG_FILE}: {e}", file=sys.stderr)
+            return 1
+        for year, count in moved.items():
+            print(f"{year}: archived {count} entries")
+        if not moved:
+            print(f"No entries dated before {args.before}.")
+        store.save_snapshot()
+    elif args.command == "reports":
+        store = WorkLogStore(args.log)
+        try:
+            store.load()
+        except OSError as e:
+            print(f"Could not read {args.log}: {e}", file=sys.stderr)
+            return 1
+        kinds = ("project", "month") if args.by == "both" else (args.by,)
+        column_path, jobs = prepare_batch_reports(store, args.out_dir, kinds)
+        try:
+            if jobs:
+                with ProcessPoolExecutor(args.workers) as pool:
+                    for out_path, rows in pool.map(write_batch_report, *zip(*jobs)):
+                        print(f"{out_path} ({rows} entries)")
+        finally:
+            os.remove(column_path)
+        print(f"Wrote {len(jobs)} reports to {args.out_dir}")
+    elif args.command == "stats":
+        try:
+            stats = stream_statistics(args.log, args.chunk_size)
+        except OSError as e:
+            print(f"Could not read {args.log}: {e}", file=sys.stderr)
+            return 1
+        print(f"Read {stats.rows} rows, skipped {stats.rejected} invalid rows.")
+        if not stats.project_hours:
+            print("No valid data found in the log.", file=sys.stderr)
+            return 1
+        figures = statistics_figures(stats.project_hours, stats.bucket_hours("week"), stats.bucket_hours("day"))
+        if args.pdf:
+            write_statistics_pdf(args.pdf, stats.project_hours, [figure_png(figure) for _, figure in figures])
+            print(f"Statistics report exported to {args.pdf}")
+        else:
+            plt.show()
+    elif args.command == "import":
+        column_map = {}
+        for mapping in args.map:
+            field, _, column = mapping.partition("=")
+            if field not in LOG_HEADER or not column:
+                parser.error(f"invalid --map '{mapping}'")
+            column_map[field] = column
+        try:
+            result = import_work_logs(args.source, column_map, args.date_format)
+        except (OSError, ValueError) as e:
+            print(f"Import failed: {e}", file=sys.stderr)
+            return 1
+        print(f"Imported {result['imported']} rows, rejected {result['rejected']}.")
+        for line, reason in result["errors"]:
+            print(f"  line {line}: {reason}")
+        if args.add_projects:
+            with locked_file(PROJECTS_FILE):
+                with open(PROJECTS_FILE, mode='r') as file:
+                    projects = [row[0] for row in csv.reader(file) if row]
+                new_projects = sorted(result["projects"] - set(projects))
+                if new_projects:
+                    atomic_write_rows(PROJECTS_FILE, [[p] for p in sorted(projects + new_projects)])
+                    print(f"Added projects: {', '.join(new_projects)}")
+    return 0
+
+
+def run_gui(api_port=None):
     root = tk.Tk()
-    app = WorkLoggerApp(root)
+    app = WorkLoggerApp(root, api_port)
     # Center the window
     root.eval('tk::PlaceWindow . center')
     root.mainloop()
 
+
+if __name__ == "__main__":
+    try:
+        run_migrations()
+    except (SchemaVersionError, MigrationError) as e:
+        print(e, file=sys.stderr)
+        if len(sys.argv) == 1:
+            # Started as the GUI, probably without a terminal to read the message.
+            error_root = tk.Tk()
+            error_root.withdraw()
+            messagebox.showerror("Cannot Upgrade Data Files", str(e), parent=error_root)
+        sys.exit(1)
+    try:
+        finish_pending_archive()
+    except (OSError, ConcurrentModificationError) as e:
+        print(f"Could not finish archiving {LOG_FILE}: {e}", file=sys.stderr)
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
+    run_gui()
+